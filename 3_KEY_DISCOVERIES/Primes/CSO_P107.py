@@ -4,17 +4,16 @@
 # Applicable Rules: All. A Chronospectroscopy analysis of the Prime Lattice.
 
 import numpy as np
-import matplotlib.pyplot as plt
 import argparse
+import os
+import sys
 
-def generate_primes(n):
-    sieve = np.ones(n // 2, dtype=np.bool_)
-    for i in range(3, int(n**0.5) + 1, 2):
-        if sieve[i // 2 - 1]:
-            sieve[i*i // 2 - 1::i] = False
-    return [2] + [2 * i + 3 for i, v in enumerate(sieve) if v]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '4_PCML_ENGINE'))
+from pcml.primes import first_primes
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
+from pcml.chronospectrum import CHRONO_CHUNK, chunk_bounds, stream_resonances, pacer_sweep, report_pacer_sweep
 
-def run_lattice_chronospectroscopy(num_primes, pacer_speed):
+def run_lattice_chronospectroscopy(num_primes, pacer_speed, output=None):
     """
     Generates the Prime Lattice and analyzes it via Chronospectroscopy.
     """
@@ -23,25 +22,17 @@ def run_lattice_chronospectroscopy(num_primes, pacer_speed):
     # 1. Generate the Prime Lattice points
     kappa_refined = 1.69500000 - 0.00653061j
     print(f"Generating Prime Lattice with κ_refined = {kappa_refined:.8f}")
-    primes = np.array(generate_primes(int(num_primes * 1.5 * np.log(num_primes)))[:num_primes])
+    primes = first_primes(num_primes)
     lattice_points = primes / kappa_refined
     
     # 2. Run the "race" to find Tangent Resonances
     print("Searching for Tangent Resonances...")
-    chronospectrum = []
-    # The process "angle" here is just the index of the prime
-    for n, point in enumerate(lattice_points):
-        if n == 0: continue
-            
-        system_angle = np.angle(point) # The angle of the n-th point on the lattice
-        pacer_angle = n * pacer_speed  # The Pacer moves at a constant angular velocity
-        
-        # We check the tangents for resonance
-        system_tan = np.tan(system_angle)
-        pacer_tan = np.tan(pacer_angle)
-        
-        if np.isclose(system_tan, pacer_tan, atol=0.01):
-            chronospectrum.append(n) # Record the prime index 'n'
+    # The process "angle" here is just the index of the prime; the Pacer moves
+    # at a constant angular velocity, n * pacer_speed. Each block of the lattice
+    # is judged with one tangent comparison.
+    chronospectrum = stream_resonances(((start, np.angle(lattice_points[start:stop]))
+                                          for start, stop in chunk_bounds(len(lattice_points), CHRONO_CHUNK)),
+                                         pacer_speed, atol=0.01)
             
     print(f"\nFound {len(chronospectrum)} resonance points in the Chronospectrum.")
 
@@ -56,17 +47,70 @@ def run_lattice_chronospectroscopy(num_primes, pacer_speed):
     print(f"Average spacing between resonances: {avg_spacing:.4f} (prime indices)")
     print("------------------------------------------")
     
+    save_arrays(output, chronospectrum=chronospectrum, spacings=spacings)
+    if not draws_figure(output): return
+    plt = pyplot(output)
     fig, ax = plt.subplots(figsize=(16, 6))
     plt.style.use('dark_background')
     ax.eventplot(chronospectrum, orientation='horizontal', colors='lime')
     ax.set_title('Chronospectrum of the Prime Lattice', color='white')
     ax.set_xlabel('Prime Index (n)', color='white')
     ax.set_yticks([])
-    plt.show()
+    finish_figure(fig, output)
+
+def run_lattice_pacer_sweep(num_primes, pacer_speeds, map_bins=400, output=None):
+    """
+    Sweeps the Pacer over `pacer_speeds` in one pass over the Prime Lattice
+    and finds the speed with the most regular chronospectrum.
+    """
+    print("--- PRIME LATTICE CHRONOSPECTROSCOPY ENGINE (PACER SWEEP) ---")
+    kappa_refined = 1.69500000 - 0.00653061j
+    primes = first_primes(num_primes)
+    lattice_points = primes / kappa_refined
+    total = len(lattice_points)
+    print(f"Sweeping {len(pacer_speeds)} Pacer speeds in [{pacer_speeds[0]}, {pacer_speeds[-1]}] over {total} primes...")
+    sweep = pacer_sweep(((start, np.angle(lattice_points[start:stop])) for start, stop in chunk_bounds(total, CHRONO_CHUNK)),
+                        pacer_speeds, atol=0.01, total=total, map_bins=map_bins)
+    best = report_pacer_sweep(sweep, 'prime indices')
+    save_arrays(output, **sweep)
+    if best is None or not draws_figure(output):
+        return
+
+    plt = pyplot(output)
+    has_map = 'density' in sweep
+    fig, axes = plt.subplots(2 if has_map else 1, 1, figsize=(16, 10 if has_map else 6), squeeze=False)
+    ax_curve = axes[0, 0]
+    plt.style.use('dark_background')
+    ax_curve.plot(sweep['speeds'], sweep['normalized_error'], color='lime')
+    ax_curve.axvline(sweep['speeds'][best], color='white', linestyle='--')
+    ax_curve.set_title('Chronospectrum Regularity vs Pacer Speed (Prime Lattice)', color='white')
+    ax_curve.set_xlabel('Pacer Speed', color='white')
+    ax_curve.set_ylabel('Normalized Error (std/avg)', color='white')
+    if has_map:
+        ax_map = axes[1, 0]
+        ax_map.imshow(sweep['density'], aspect='auto', origin='lower', cmap='magma',
+                      extent=[0, total, sweep['speeds'][0], sweep['speeds'][-1]])
+        ax_map.set_title('Chronospectrum Map: resonances per index bin', color='white')
+        ax_map.set_xlabel('Prime Index (n)', color='white')
+        ax_map.set_ylabel('Pacer Speed', color='white')
+    plt.tight_layout()
+    finish_figure(fig, output)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Prime Lattice Chronospectroscopy.")
     parser.add_argument("--primes", type=int, default=50000)
     parser.add_argument("--pacer_speed", type=float, default=0.01)
+    parser.add_argument("--sweep", type=float, nargs=3, metavar=("MIN", "MAX", "COUNT"), default=None,
+                        help="Sweep COUNT Pacer speeds from MIN to MAX instead of one --pacer_speed.")
+    parser.add_argument("--map_bins", type=int, default=400, help="Index bins of the --sweep chronospectrum map (0 = no map).")
+    add_output_arguments(parser)
     args = parser.parse_args()
-    run_lattice_chronospectroscopy(args.primes, args.pacer_speed)
\ No newline at end of file
+    if args.sweep and int(args.sweep[2]) < 1:
+        parser.error("--sweep COUNT must be at least 1")
+    if args.map_bins < 0:
+        parser.error("--map_bins must be 0 (no map) or positive")
+    if args.sweep:
+        run_lattice_pacer_sweep(args.primes, np.linspace(args.sweep[0], args.sweep[1], int(args.sweep[2])), args.map_bins,
+                                output_options(args))
+    else:
+        run_lattice_chronospectroscopy(args.primes, args.pacer_speed, output_options(args))
\ No newline at end of file
@@ -5,23 +5,18 @@
 # Rule 11: Uses a global statistical method (FFT) ideal for heuristic analysis.
 # Rule 12: Standardized program name.
 
-import matplotlib.pyplot as plt
 import numpy as np
+import argparse
+import os
+import sys
 
-def generate_primes(n):
-    """Generates primes up to n using a Sieve."""
-    primes = []
-    sieve = [True] * (n + 1)
-    for i in range(2, int(n**0.5) + 1):
-        if sieve[i]:
-            for multiple in range(i*i, n + 1, i):
-                sieve[multiple] = False
-    for i in range(n + 1):
-        if sieve[i]:
-            primes.append(i)
-    return primes
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '4_PCML_ENGINE'))
+from pcml.primes import first_primes
+from pcml.raster import rasterize
+from pcml.spectrum import centred_log_magnitude
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
 
-def analyze_spiral_with_fft(num_primes, image_size):
+def analyze_spiral_with_fft(num_primes, image_size, raster_mode='binary', output=None):
     """
     Generates the PSM spiral, rasterizes it to an image, and performs
     a 2D Fast Fourier Transform to find its frequency fingerprint.
@@ -29,8 +24,7 @@ def analyze_spiral_with_fft(num_primes, image_size):
     print("Initializing 2D-FFT Frequency Analysis...")
 
     # 1. Generate prime coordinates
-    n_limit = int(num_primes * (np.log(num_primes) + np.log(np.log(num_primes))))
-    primes = generate_primes(n_limit)[:num_primes]
+    primes = first_primes(num_primes)
     print(f"Generated {len(primes)} primes.")
 
     k = np.e - 1
@@ -41,29 +35,21 @@ def analyze_spiral_with_fft(num_primes, image_size):
 
     # 2. Rasterize the spiral onto an image plane
     print(f"Rasterizing spiral onto a {image_size}x{image_size} image plane...")
-    image_plane = np.zeros((image_size, image_size))
-    
-    # Find scale to fit all points within the image bounds
-    max_coord = np.max(np.abs(np.concatenate([x_coords, y_coords])))
-    scale_factor = (image_size / 2 - 1) / max_coord
-    
-    # Map coordinates to integer pixel indices
-    ix = (x_coords * scale_factor + image_size / 2).astype(int)
-    iy = (y_coords * scale_factor + image_size / 2).astype(int)
-    
-    # Place points on the image plane
-    image_plane[iy, ix] = 1
+    # Scale to fit all points within the image bounds and place them on the
+    # plane ('count' / 'bilinear' keep the density of overlapping points)
+    image_plane = rasterize(x_coords, y_coords, image_size, mode=raster_mode)
 
     # 3. Perform the 2D-FFT
     print("Performing 2D Fast Fourier Transform...")
-    # Perform FFT and shift the zero-frequency component to the center
-    fft_result = np.fft.fftshift(np.fft.fft2(image_plane))
-    
-    # Calculate magnitude and use a log scale to see details
-    fft_magnitude = np.log1p(np.abs(fft_result))
+    # Real-input FFT with the zero-frequency component shifted to the center,
+    # as a log-scaled magnitude to see details
+    fft_magnitude = centred_log_magnitude(image_plane)
 
     # 4. Plot the results
+    save_arrays(output, image_plane=image_plane, fft_magnitude=fft_magnitude)
+    if not draws_figure(output): return
     print("Displaying results...")
+    plt = pyplot(output)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
     plt.style.use('dark_background')
 
@@ -75,9 +61,14 @@ def analyze_spiral_with_fft(num_primes, image_size):
     ax2.imshow(fft_magnitude, cmap='hot', origin='lower')
     ax2.set_title('Frequency Fingerprint (2D-FFT)', color='white')
     
-    plt.show()
+    finish_figure(fig, output)
 
 # --- Execution ---
 number_of_primes_to_plot = 50000  # More primes create a clearer signal
 image_resolution = 1024          # Standard FFT size (power of 2)
-analyze_spiral_with_fft(number_of_primes_to_plot, image_resolution)
\ No newline at end of file
+raster_mode = 'binary'           # or 'count' / 'bilinear' for a density image
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PSM Spiral 2D-FFT fingerprint.")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    analyze_spiral_with_fft(number_of_primes_to_plot, image_resolution, raster_mode, output_options(args))
\ No newline at end of file
@@ -6,33 +6,30 @@
 import numpy as np
 import time
 import argparse
+import os
+import sys
 
-# (generate_primes and calculate_symmetry_score functions are identical to CSO_P59.py, included for monolithic integrity)
-def generate_primes(n):
-    sieve = np.ones(n // 2, dtype=np.bool_)
-    for i in range(3, int(n**0.5) + 1, 2):
-        if sieve[i // 2 - 1]:
-            sieve[i*i // 2 - 1::i] = False
-    return [2] + [2 * i + 3 for i, v in enumerate(sieve) if v]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '4_PCML_ENGINE'))
+from pcml.primes import first_primes
+from pcml.kappa import score_kappa_shard
+from pcml.raster import rasterize, RASTER_MODES
+from pcml.spectrum import log_magnitude_half
+from pcml.masks import symmetry_scores, mask_names
+from pcml.gridsearch import run_grid_search, select_best, resolve_workers
+from pcml.adaptive import run_adaptive_search
+from pcml.records import add_record_argument, result_record, write_record
 
-def calculate_symmetry_score(fft_magnitude):
-    image_size = fft_magnitude.shape[0]
-    center = image_size // 2
-    mask = np.zeros((image_size, image_size), dtype=bool)
-    mask[center-1:center+2, :] = True; mask[:, center-1:center+2] = True
-    diag1_indices = np.arange(image_size); diag2_indices = diag1_indices[::-1]
-    mask[diag1_indices, diag1_indices] = True; mask[diag1_indices[:-1], diag1_indices[1:]] = True; mask[diag1_indices[1:], diag1_indices[:-1]] = True
-    mask[diag1_indices, diag2_indices] = True; mask[diag1_indices[:-1], diag2_indices[1:]] = True; mask[diag1_indices[1:], diag2_indices[:-1]] = True
-    scaffold_energy = np.sum(fft_magnitude[mask])
-    total_energy = np.sum(fft_magnitude)
-    return scaffold_energy / total_energy if total_energy > 0 else 0
+# (calculate_symmetry_score delegates to the shared pcml.masks registry, as in CSO_P59.py)
+def calculate_symmetry_score(fft_magnitude, mask_name='scaffold'):
+    """Scaffold / total energy of a half-plane log spectrum; the mask comes from the pcml.masks registry."""
+    return float(symmetry_scores(fft_magnitude, mask_name))
 
-def run_kappa_optimizer(num_primes, image_size, search_steps):
+def run_kappa_optimizer(num_primes, image_size, search_steps, batch_size=16, workers=1, adaptive=False, tolerance=1e-8, raster_mode='binary', mask_name='scaffold'):
     print("--- HIGH-PRECISION KAPPA OPTIMIZER STARTED ---")
-    print(f"Parameters: Primes={num_primes}, Resolution={image_size}, Grid Steps={search_steps}")
+    print(f"Parameters: Primes={num_primes}, Resolution={image_size}, Grid Steps={search_steps}, Batch={batch_size}, Workers={resolve_workers(workers)}")
     print(f"Total iterations: {search_steps*search_steps}. This will take a significant amount of time.")
     
-    primes = np.array(generate_primes(int(num_primes * 1.5 * np.log(num_primes)))[:num_primes])
+    primes = first_primes(num_primes)
     
     # --- The Refined Search Box ---
     # Centered on our previous best guess (1.70, -0.0064)
@@ -43,30 +40,50 @@ def run_kappa_optimizer(num_primes, image_size, search_steps):
     best_kappa = None; max_score = -1; start_time = time.time()
     total_iterations = search_steps * search_steps; count = 0
     
-    for a in a_range:
-        for b in b_range:
-            count += 1
-            if count % 25 == 0 or count == 1: print(f"  > Progress: {count}/{total_iterations}...")
+    if adaptive:
+        # Adaptive mode: coarse grid over the same box, then zoom onto the best cell.
+        result = run_adaptive_search(score_kappa_shard, [(a_range[0], a_range[-1]), (b_range[0], b_range[-1])],
+                                     {'primes': primes}, {'image_size': image_size, 'batch_size': batch_size, 'raster_mode': raster_mode, 'mask_name': mask_name},
+                                     tolerance=tolerance, workers=workers,
+                                     report=lambda r, p, s, d: print(f"  > Round {r}: κ = {p[0]:.10f} + {p[1]:.10f}i | Score: {s:.6f} | Cell: ±{d.max():.1e}"))
+        if result['best_params'] is not None:
+            max_score = result['best_score']
+            best_kappa = result['best_params'][0] + 1j * result['best_params'][1]
+        evaluations = result['evaluations']
+        print(f"Adaptive search: {result['evaluations']} FFT evaluations in {result['rounds']} rounds, κ resolved to ±{result['spacing'].max():.1e}")
+    elif batch_size > 1 or workers != 1:
+        # Batched mode: one FFT call per block of kappas, one shared scaffold mask,
+        # with the grid sharded across `workers` processes.
+        kappa_grid = (a_range[:, None] + 1j * b_range[None, :]).ravel()
+        scores = run_grid_search(score_kappa_shard, np.column_stack([kappa_grid.real, kappa_grid.imag]),
+                                 {'primes': primes}, {'image_size': image_size, 'batch_size': batch_size, 'raster_mode': raster_mode, 'mask_name': mask_name}, workers,
+                                 progress=lambda done, total: print(f"  > Progress: {done}/{total}..."))
+        best_index, best_score = select_best(scores)
+        evaluations = len(kappa_grid)
+        if best_index is not None: max_score = best_score; best_kappa = kappa_grid[best_index]
+    else:
+        image_plane = np.zeros((image_size, image_size))
+        evaluations = total_iterations
+        for a in a_range:
+            for b in b_range:
+                count += 1
+                if count % 25 == 0 or count == 1: print(f"  > Progress: {count}/{total_iterations}...")
 
-            current_kappa = a + 1j * b
-            rescaled_primes = primes / current_kappa
-            radii, thetas = np.abs(rescaled_primes), np.angle(rescaled_primes)
-            x_coords, y_coords = radii * np.cos(thetas), radii * np.sin(thetas)
+                current_kappa = a + 1j * b
+                rescaled_primes = primes / current_kappa
+                radii, thetas = np.abs(rescaled_primes), np.angle(rescaled_primes)
+                x_coords, y_coords = radii * np.cos(thetas), radii * np.sin(thetas)
             
-            image_plane = np.zeros((image_size, image_size))
-            max_coord = np.max(np.abs(np.concatenate([x_coords, y_coords])))
-            if max_coord == 0: continue
-            scale_factor = (image_size / 2 - 1) / max_coord
-            ix = np.clip((x_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-            iy = np.clip((y_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-            image_plane[iy, ix] = 1
+                max_coord = np.max(np.abs(np.concatenate([x_coords, y_coords])))
+                if max_coord == 0: continue
+                image_plane = rasterize(x_coords, y_coords, image_size, max_coord, raster_mode, image_plane)
             
-            fft_magnitude = np.log1p(np.abs(np.fft.fftshift(np.fft.fft2(image_plane))))
-            score = calculate_symmetry_score(fft_magnitude)
+                fft_magnitude = log_magnitude_half(image_plane)
+                score = calculate_symmetry_score(fft_magnitude, mask_name)
             
-            if score > max_score:
-                max_score = score
-                best_kappa = current_kappa
+                if score > max_score:
+                    max_score = score
+                    best_kappa = current_kappa
     
     end_time = time.time()
     print("\n--- REFINED SEARCH COMPLETE ---")
@@ -75,11 +92,21 @@ def run_kappa_optimizer(num_primes, image_size, search_steps):
         print(f"Optimal Kappa (κ_refined) Found: {best_kappa.real:.8f} + {best_kappa.imag:.8f}i")
         print(f"Maximum Symmetry Score: {max_score:.6f}")
     else: print("Search did not yield a result.")
+    return {'best_kappa': best_kappa, 'best_score': max_score if best_kappa else None,
+            'evaluations': evaluations, 'elapsed': end_time - start_time}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="High-Precision Kappa Optimizer for Cso Hypothesis.")
     parser.add_argument("--primes", type=int, default=50000, help="Number of primes to use.")
     parser.add_argument("--resolution", type=int, default=512, help="FFT image resolution.")
     parser.add_argument("--steps", type=int, default=50, help="Number of grid steps for the search (e.g., 50 for a 50x50 grid).")
+    parser.add_argument("--batch", type=int, default=16, help="Kappas per batched FFT block (1 = serial search).")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the grid search (0 = all cores).")
+    parser.add_argument("--adaptive", action="store_true", help="Coarse-to-fine zoom search instead of the fixed grid.")
+    parser.add_argument("--tol", type=float, default=1e-8, help="Kappa tolerance at which the adaptive search stops.")
+    parser.add_argument("--raster", type=str, default="binary", choices=RASTER_MODES, help="Fingerprint rasterization: binary, count (density) or bilinear.")
+    parser.add_argument("--mask", type=str, default="scaffold", choices=mask_names(), help="Registered score mask the symmetry is judged against.")
+    add_record_argument(parser)
     args = parser.parse_args()
-    run_kappa_optimizer(args.primes, args.resolution, args.steps)
\ No newline at end of file
+    result = run_kappa_optimizer(args.primes, args.resolution, args.steps, args.batch, args.workers, args.adaptive, args.tol, args.raster, args.mask)
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
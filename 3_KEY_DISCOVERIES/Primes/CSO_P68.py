@@ -3,36 +3,33 @@
 # Timestamp: 2024-05-21 20:35:00 UTC
 # Applicable Rules: All. The ultimate test of our refined constant.
 
-import matplotlib.pyplot as plt
 import numpy as np
 from scipy.signal import find_peaks
 import argparse
+import os
+import sys
 
-def generate_primes(n):
-    sieve = np.ones(n // 2, dtype=np.bool_)
-    for i in range(3, int(n**0.5) + 1, 2):
-        if sieve[i // 2 - 1]:
-            sieve[i*i // 2 - 1::i] = False
-    return [2] + [2 * i + 3 for i, v in enumerate(sieve) if v]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '4_PCML_ENGINE'))
+from pcml.primes import first_prime_chunks
+from pcml.lanes import LANE_CHUNK, LANE_RANGE, REFINE_METHODS, lane_histogram, refine_peaks, lane_spacing_fft
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
+from pcml.records import add_record_argument, result_record, write_record
 
-def run_final_test(num_primes, num_bins):
+def run_final_test(num_primes, num_bins, output=None, value_range=LANE_RANGE, refine='parabolic', chunk_size=LANE_CHUNK):
     print("--- HIGH-PRECISION LANE ANALYSIS ENGINE ---")
     
     # --- The High-Precision Constant ---
     kappa_refined = 1.69500000 - 0.00653061j 
     print(f"Testing with κ_refined = {kappa_refined:.8f}")
     
-    # 1. Generate and transform primes
-    print(f"Generating and transforming {num_primes} primes...")
-    primes = np.array(generate_primes(int(num_primes * 1.5 * np.log(num_primes)))[:num_primes])
-    transformed_points = primes / kappa_refined
-    y_coords = transformed_points.imag
-
-    # 2. Create a high-resolution histogram
-    print("Creating high-resolution histogram of the Prime Lattice...")
+    # 1 & 2. Stream the transformed primes into a high-resolution histogram
+    print(f"Streaming up to {num_primes:,} primes into the Prime Lattice histogram...")
     # Focus on the very narrow central region where lanes are expected
-    hist_counts, bin_edges = np.histogram(y_coords, bins=num_bins, range=(-5, 5))
+    hist_counts, bin_edges, primes_read = lane_histogram(first_prime_chunks(num_primes, chunk_size), kappa_refined,
+                                                         num_bins, value_range)
     bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    bin_width = bin_edges[1] - bin_edges[0]
+    print(f"{int(hist_counts.sum()):,} of the {primes_read:,} primes read fall inside {value_range}.")
     
     # 3. Find peaks (the lane centers)
     # We set the height dynamically based on the noise floor
@@ -40,24 +37,34 @@ def run_final_test(num_primes, num_bins):
     std_count = np.std(hist_counts)
     min_peak_height = mean_count + (2.5 * std_count) # Peaks must be 2.5 std_devs above the mean
     peaks, _ = find_peaks(hist_counts, height=min_peak_height, distance=5)
-    lane_centers = bin_centers[peaks]
+    # Sub-bin lane centers from a fit through each peak and its neighbours
+    lane_centers = refine_peaks(hist_counts, peaks, bin_edges, refine)
     
     print(f"\nFound {len(lane_centers)} distinct lattice lanes.")
+    result = {'kappa': kappa_refined, 'primes_read': primes_read, 'lanes': len(lane_centers), 'lane_centers': lane_centers,
+              'lane_spacing': None, 'spectral_power': 0.0, 'peak_spacing': None, 'peak_spacing_std': None}
     
-    # 4. Calculate lambda
+    # 4. Calculate lambda from the histogram's power spectrum
+    lambda_val, spectral_power = lane_spacing_fft(hist_counts, bin_width, min_period_bins=5)
+    print("------------------------------------------")
+    if lambda_val is not None:
+        print(f"Fundamental Lane Spacing (λ_p) ≈ {lambda_val:.6f}  (FFT, {spectral_power:.1%} of the spectral power)")
+        result.update(lane_spacing=lambda_val, spectral_power=spectral_power)
+    else:
+        print("No lane period found in the histogram's power spectrum.")
     if len(lane_centers) > 1:
         lane_spacings = np.diff(np.sort(lane_centers))
-        lambda_val = np.mean(lane_spacings)
-        lambda_std = np.std(lane_spacings)
-        print("------------------------------------------")
-        print(f"Fundamental Lane Spacing (λ_p) ≈ {lambda_val:.6f}")
-        print(f"Standard Deviation of Spacing: {lambda_std:.6f}")
-        print("------------------------------------------")
+        print(f"Mean Peak Spacing: {np.mean(lane_spacings):.6f} +/- {np.std(lane_spacings):.6f} ({refine} sub-bin centers)")
+        result.update(peak_spacing=np.mean(lane_spacings), peak_spacing_std=np.std(lane_spacings))
+    print("------------------------------------------")
 
     # 5. Visualization
+    save_arrays(output, bin_centers=bin_centers, hist_counts=hist_counts, lane_centers=lane_centers)
+    if not draws_figure(output): return result
+    plt = pyplot(output)
     fig, ax = plt.subplots(figsize=(16, 9))
     plt.style.use('dark_background')
-    ax.bar(bin_centers, hist_counts, width=(bin_centers[1]-bin_centers[0])*0.9, color='lime')
+    ax.bar(bin_centers, hist_counts, width=bin_width*0.9, color='lime')
     
     for center in lane_centers:
         ax.axvline(center, color='red', linestyle='--', alpha=0.8)
@@ -65,13 +72,20 @@ def run_final_test(num_primes, num_bins):
     ax.set_title('The Prime Lattice (Corrected by High-Precision κ)', color='white')
     ax.set_xlabel('Imaginary Component (Lane Position)', color='white')
     ax.set_ylabel('Frequency (Number of Primes)', color='white')
-    plt.show()
+    finish_figure(fig, output)
+    return result
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Final Test of the refined Kappa constant.")
     parser.add_argument("--primes", type=int, default=250000, help="Number of primes to use.")
     parser.add_argument("--bins", type=int, default=4000, help="Number of bins for the histogram.")
+    parser.add_argument("--range", type=float, nargs=2, default=list(LANE_RANGE), metavar=('LOW', 'HIGH'), help="Lane positions the histogram covers.")
+    parser.add_argument("--refine", type=str, default="parabolic", choices=REFINE_METHODS, help="Sub-bin fit of each lane center.")
+    parser.add_argument("--chunk", type=int, default=LANE_CHUNK, help="Primes per streamed block.")
+    add_output_arguments(parser)
+    add_record_argument(parser)
     
     args = parser.parse_args()
     
-    run_final_test(args.primes, args.bins)
\ No newline at end of file
+    result = run_final_test(args.primes, args.bins, output_options(args), tuple(args.range), args.refine, args.chunk)
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
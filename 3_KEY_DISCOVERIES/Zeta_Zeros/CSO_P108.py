@@ -4,11 +4,14 @@
 # Applicable Rules: All. A corrected simulator using the Tangent Flow Process.
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import argparse
+import os
+import sys
 
-def run_true_resonance_simulation(shape, steps, focal_distance):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '4_PCML_ENGINE'))
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
+
+def run_true_resonance_simulation(shape, steps, focal_distance, output=None):
     """
     Simulates a Resonant System (Circle or Ellipse) and generates its
     True Chronospectrum using the Tangent Flow Process.
@@ -42,17 +45,20 @@ def run_true_resonance_simulation(shape, steps, focal_distance):
     chronospectrum = theta_p[resonance_indices]
 
     # --- Visualization ---
-    fig, ax = plt.subplots(figsize=(10, 10))
-    plt.style.use('dark_background')
-    ax.set_aspect('equal')
-    ax.set_title(f"True Tangent Resonances of a {shape.upper()}", color='white')
-    ax.grid(color='gray', linestyle='--', alpha=0.3)
-    
-    # Plot the path and the resonance points
-    ax.plot(path_points[:, 0], path_points[:, 1], '-', color='cyan', lw=1, alpha=0.5)
-    ax.scatter(path_points[resonance_indices, 0], path_points[resonance_indices, 1],
-               s=150, c='yellow', marker='*', zorder=10)
-    plt.show()
+    save_arrays(output, path_points=path_points, resonance_indices=resonance_indices, chronospectrum=chronospectrum)
+    if draws_figure(output):
+        plt = pyplot(output)
+        fig, ax = plt.subplots(figsize=(10, 10))
+        plt.style.use('dark_background')
+        ax.set_aspect('equal')
+        ax.set_title(f"True Tangent Resonances of a {shape.upper()}", color='white')
+        ax.grid(color='gray', linestyle='--', alpha=0.3)
+        
+        # Plot the path and the resonance points
+        ax.plot(path_points[:, 0], path_points[:, 1], '-', color='cyan', lw=1, alpha=0.5)
+        ax.scatter(path_points[resonance_indices, 0], path_points[resonance_indices, 1],
+                   s=150, c='yellow', marker='*', zorder=10)
+        finish_figure(fig, output)
     
     # --- Reporting ---
     print("\n--- SIMULATION COMPLETE ---")
@@ -66,6 +72,7 @@ def run_true_resonance_simulation(shape, steps, focal_distance):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="True Resonance Simulator.")
     parser.add_argument("--shape", type=str, default="ellipse", choices=["circle", "ellipse"])
+    add_output_arguments(parser)
     args = parser.parse_args()
     
-    run_true_resonance_simulation(shape=args.shape, steps=2000, focal_distance=0.8)
\ No newline at end of file
+    run_true_resonance_simulation(shape=args.shape, steps=2000, focal_distance=0.8, output=output_options(args))
\ No newline at end of file
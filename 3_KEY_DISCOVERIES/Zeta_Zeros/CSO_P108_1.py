@@ -4,24 +4,16 @@
 # Applicable Rules: All. A Chronospectroscopy analysis of the Zetaform Spiral.
 
 import numpy as np
-import matplotlib.pyplot as plt
 import argparse
+import os
+import sys
 
-def generate_zeta_like_data(n):
-    t_values = []; current_t = 14.134725
-    while len(t_values) < n:
-        t_values.append(current_t); gap = (2 * np.pi) / np.log(current_t)
-        current_t += gap * (1 + (np.random.rand() - 0.5) * 0.1)
-    return np.array(t_values)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '4_PCML_ENGINE'))
+from pcml.zetaform import zeta_ordinates, zeta_shape_hash_chunks
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
+from pcml.chronospectrum import CHRONO_CHUNK, stream_resonances, pacer_sweep, report_pacer_sweep
 
-def compute_zeta_shape_hash(t_prev, t_curr, t_next):
-    try:
-        g_in = t_curr - t_prev; g_out = t_next - t_curr
-        if g_in <= 1e-9 or g_out <= 1e-9: return 1.0
-        return np.log(g_out) / np.log(g_in)
-    except (ValueError, ZeroDivisionError): return 1.0
-
-def run_zeta_chronospectroscopy(num_zeros, pacer_speed):
+def run_zeta_chronospectroscopy(num_zeros, pacer_speed, seed=None, zeros_file=None, zero_start=0, output=None):
     """
     Generates the Zetaform Spiral v2.0 and analyzes it via Chronospectroscopy.
     """
@@ -29,31 +21,18 @@ def run_zeta_chronospectroscopy(num_zeros, pacer_speed):
     
     # 1. Generate the Zetaform Spiral's underlying data
     print("Step 1: Generating Zetaform data...")
-    t_values = generate_zeta_like_data(num_zeros)
-    shape_hashes = [1.0]
-    for i in range(1, len(t_values) - 1):
-        shape_hashes.append(compute_zeta_shape_hash(t_values[i-1], t_values[i], t_values[i+1]))
-    shape_hashes.append(1.0)
-    shape_hashes = np.clip(np.array(shape_hashes), 0.5, 1.5)
+    t_values, zeta_source = zeta_ordinates(num_zeros, seed, zeros_file, zero_start)
+    num_zeros = len(t_values)
+    print(f"Zeta data: {zeta_source}")
     
     # 2. Run the "race" to find Tangent Resonances
     print("Step 2: Searching for Tangent Resonances...")
-    chronospectrum = []
-    # The process "angle" is the index of the Zeta zero
-    for n in range(num_zeros):
-        if n == 0: continue
-        
-        # Calculate the system's angular state
-        # θ_psm = t_n * v_ζ(t_n)
-        system_psm_angle = t_values[n] * shape_hashes[n]
-        system_tan = np.tan(system_psm_angle)
-        
-        # The Pacer moves at a constant angular velocity
-        pacer_angle = n * pacer_speed
-        pacer_tan = np.tan(pacer_angle)
-        
-        if np.isclose(system_tan, pacer_tan, atol=0.05):
-            chronospectrum.append(n) # Record the zero index 'n'
+    # The process "angle" is the index of the Zeta zero. The system's angular
+    # state is θ_psm = t_n * v_ζ(t_n); the Pacer moves at n * pacer_speed.
+    # Zeros stream through in blocks, so a memory-mapped store is read once.
+    chronospectrum = stream_resonances(((start, t_values[start:start + len(hashes)] * np.clip(hashes, 0.5, 1.5))
+                                          for start, hashes in zeta_shape_hash_chunks(t_values, CHRONO_CHUNK)),
+                                         pacer_speed, atol=0.05)
             
     print(f"\nFound {len(chronospectrum)} resonance points in the Chronospectrum.")
 
@@ -71,17 +50,74 @@ def run_zeta_chronospectroscopy(num_zeros, pacer_speed):
     print(f"Normalized Error (std_dev/avg): {std_dev_spacing/avg_spacing:.4f}")
     print("------------------------------------------")
     
+    save_arrays(output, chronospectrum=chronospectrum, spacings=spacings)
+    if not draws_figure(output): return
+    plt = pyplot(output)
     fig, ax = plt.subplots(figsize=(16, 6))
     plt.style.use('dark_background')
     ax.eventplot(chronospectrum, orientation='horizontal', colors='cyan')
     ax.set_title('Chronospectrum of the Zetaform Spiral v2.0', color='white')
     ax.set_xlabel('Zeta Zero Index (n)', color='white')
     ax.set_yticks([])
-    plt.show()
+    finish_figure(fig, output)
+
+def run_zeta_pacer_sweep(num_zeros, pacer_speeds, seed=None, zeros_file=None, zero_start=0, map_bins=400, output=None):
+    """
+    Sweeps the Pacer over `pacer_speeds` in one pass over the Zetaform data
+    and finds the speed with the most regular chronospectrum.
+    """
+    print("--- ZETAFORM CHRONOSPECTROSCOPY ENGINE (PACER SWEEP) ---")
+    t_values, zeta_source = zeta_ordinates(num_zeros, seed, zeros_file, zero_start)
+    total = len(t_values)
+    print(f"Zeta data: {zeta_source}")
+    print(f"Sweeping {len(pacer_speeds)} Pacer speeds in [{pacer_speeds[0]}, {pacer_speeds[-1]}] over {total} zeros...")
+    sweep = pacer_sweep(((start, t_values[start:start + len(hashes)] * np.clip(hashes, 0.5, 1.5))
+                         for start, hashes in zeta_shape_hash_chunks(t_values, CHRONO_CHUNK)),
+                        pacer_speeds, atol=0.05, total=total, map_bins=map_bins)
+    best = report_pacer_sweep(sweep, 'zero indices')
+    save_arrays(output, **sweep)
+    if best is None or not draws_figure(output):
+        return
+
+    plt = pyplot(output)
+    has_map = 'density' in sweep
+    fig, axes = plt.subplots(2 if has_map else 1, 1, figsize=(16, 10 if has_map else 6), squeeze=False)
+    ax_curve = axes[0, 0]
+    plt.style.use('dark_background')
+    ax_curve.plot(sweep['speeds'], sweep['normalized_error'], color='cyan')
+    ax_curve.axvline(sweep['speeds'][best], color='white', linestyle='--')
+    ax_curve.set_title('Chronospectrum Regularity vs Pacer Speed (Zetaform Spiral v2.0)', color='white')
+    ax_curve.set_xlabel('Pacer Speed', color='white')
+    ax_curve.set_ylabel('Normalized Error (std/avg)', color='white')
+    if has_map:
+        ax_map = axes[1, 0]
+        ax_map.imshow(sweep['density'], aspect='auto', origin='lower', cmap='magma',
+                      extent=[0, total, sweep['speeds'][0], sweep['speeds'][-1]])
+        ax_map.set_title('Chronospectrum Map: resonances per index bin', color='white')
+        ax_map.set_xlabel('Zeta Zero Index (n)', color='white')
+        ax_map.set_ylabel('Pacer Speed', color='white')
+    plt.tight_layout()
+    finish_figure(fig, output)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Zetaform Chronospectroscopy.")
     parser.add_argument("--zeros", type=int, default=50000)
     parser.add_argument("--pacer_speed", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the synthetic zeta data (default: fresh, printed).")
+    parser.add_argument("--zeros_file", type=str, default=None, help="Real zero table (.txt, one per line) or .npy store instead of synthetic data.")
+    parser.add_argument("--zero_start", type=int, default=0, help="Index of the first real zero to use.")
+    parser.add_argument("--sweep", type=float, nargs=3, metavar=("MIN", "MAX", "COUNT"), default=None,
+                        help="Sweep COUNT Pacer speeds from MIN to MAX instead of one --pacer_speed.")
+    parser.add_argument("--map_bins", type=int, default=400, help="Index bins of the --sweep chronospectrum map (0 = no map).")
+    add_output_arguments(parser)
     args = parser.parse_args()
-    run_zeta_chronospectroscopy(args.zeros, args.pacer_speed)
\ No newline at end of file
+    if args.sweep and int(args.sweep[2]) < 1:
+        parser.error("--sweep COUNT must be at least 1")
+    if args.map_bins < 0:
+        parser.error("--map_bins must be 0 (no map) or positive")
+    if args.sweep:
+        run_zeta_pacer_sweep(args.zeros, np.linspace(args.sweep[0], args.sweep[1], int(args.sweep[2])),
+                             args.seed, args.zeros_file, args.zero_start, args.map_bins, output_options(args))
+    else:
+        run_zeta_chronospectroscopy(args.zeros, args.pacer_speed, args.seed, args.zeros_file, args.zero_start,
+                                    output_options(args))
\ No newline at end of file
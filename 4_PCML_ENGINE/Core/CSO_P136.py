@@ -5,94 +5,85 @@
 
 import numpy as np
 import argparse
-import random
-import math
-
-# --- CORE FUNCTIONS ---
-def get_entropy_score(a, b, c):
-    """The Judge: Returns the number of non-square diagonals (fitness score)."""
-    if a<=0 or b<=0 or c<=0: return 4.0
-    T1 = a*a + b*b; T2 = a*a + c*c; T3 = b*b + c*c; T4 = T1 + c*c
-    d1 = 0 if int(np.sqrt(T1))**2 == T1 else 1
-    d2 = 0 if int(np.sqrt(T2))**2 == T2 else 1
-    d3 = 0 if int(np.sqrt(T3))**2 == T3 else 1
-    d4 = 0 if int(np.sqrt(T4))**2 == T4 else 1
-    return float(d1 + d2 + d3 + d4)
-
-def generate_brick_from_genes(genes):
-    """The Incubator: Generates a brick from a {m,n,p,q} gene set."""
-    m, n, p, q = genes
-    a = 4 * m * n * p * q
-    b = (m**2 - n**2) * (p**2 - q**2)
-    c = 2 * p * q * (m**2 + n**2)
-    return tuple(sorted((abs(a), abs(b), abs(c))))
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.bricks import entropy_scores
+from pcml.checkpoint import (CHECKPOINT_EVERY, default_checkpoint_path, save_checkpoint, load_checkpoint,
+                             clear_checkpoint)
+from pcml.genetic import (FITNESS_CACHE_SIZE, seed_population, bricks_from_genes, judge_population, breed_generation,
+                          new_fitness_cache, cache_report, euclid_pairs, gene_space_chunks)
+from pcml.islands import MIGRATION_EVERY, MIGRANTS, run_islands
+from pcml.gridsearch import resolve_workers
+from pcml.records import add_record_argument, result_record, write_record
 
 # --- PCML GENETIC ALGORITHM (THE ORACLE) ---
-def run_genetic_oracle(generations, population_size, mutation_rate, max_param_val):
+def run_genetic_oracle(generations, population_size, mutation_rate, max_param_val, seed=None,
+                       checkpoint_path=None, checkpoint_every=CHECKPOINT_EVERY, resume=False,
+                       cache_size=FITNESS_CACHE_SIZE):
     print("--- PCML GENETIC ALGORITHM v4.0 (THE ORACLE) ---")
+    params = {'generations': generations, 'population': population_size,
+              'mutation_rate': mutation_rate, 'max_param': max_param_val}
+    saved = load_checkpoint(checkpoint_path, params) if resume and checkpoint_path else None
+    rng = np.random.default_rng(seed)
+    fitness_cache = new_fitness_cache(cache_size)  # rebuilt on resume: fitness depends on the genes alone
     
-    # STAGE 1: The Seed Generator
-    print("Generating initial gene pool...")
-    population = []
-    while len(population) < population_size:
-        m = random.randint(2, max_param_val)
-        n = random.randint(1, m - 1)
-        p = random.randint(2, max_param_val)
-        q = random.randint(1, p - 1)
-        # Enforce coprime and parity constraints for valid primitive bricks
-        if math.gcd(m, n) == 1 and math.gcd(p, q) == 1 and (m-n)%2==1 and (p-q)%2==1:
-            population.append([m, n, p, q])
-
-    # --- Main Evolution Loop ---
-    print("Starting evolution...")
-    best_ever_brick = None
-    best_ever_entropy = 4.0
-
-    for gen in range(generations):
-        # STAGE 2 & 3: Incubate and Judge the entire population
-        fitness_scores = []
-        for genes in population:
-            brick = generate_brick_from_genes(genes)
-            entropy = get_entropy_score(*brick)
-            fitness_scores.append((entropy, genes, brick))
-            
-            if entropy < best_ever_entropy:
-                best_ever_entropy = entropy
-                best_ever_brick = brick
-                print(f"  > Gen {gen+1}: New best found! Brick: {best_ever_brick} | Entropy: {best_ever_entropy}")
-                if best_ever_entropy == 0: break
+    if saved is not None:
+        # Resume: the population, best-so-far, RNG state and counters of the last checkpoint
+        population = np.asarray(saved['population'], dtype=np.int64)
+        best_ever_brick = tuple(saved['best_ever_brick']) if saved['best_ever_brick'] else None
+        best_ever_entropy = saved['best_ever_entropy']
+        first_gen = saved['next_gen']
+        rng.bit_generator.state = saved['rng_state']
+        evaluated = saved['evaluated']
+        fitness_cache['hits'], fitness_cache['misses'] = saved['hits'], saved['misses']
+        print(f"Resuming at generation {first_gen+1} (best entropy so far: {best_ever_entropy})...")
+    else:
+        # STAGE 1: The Seed Generator
+        # (coprime and parity constraints for valid primitive bricks are enforced on every gene set)
+        print("Generating initial gene pool...")
+        population = seed_population(rng, population_size, max_param_val)
+
+        # --- Main Evolution Loop ---
+        print("Starting evolution...")
+        best_ever_brick = None
+        best_ever_entropy = 4.0
+        first_gen = 0
+        evaluated = 0
+    start_time = last_save = time.time()
+
+    for gen in range(first_gen, generations):
+        # STAGE 2 & 3: Incubate and Judge the entire population as one (N, 4) array
+        entropies = judge_population(population, fitness_cache)
+        evaluated += len(population)
+        best_index = int(np.argmin(entropies))
+        if entropies[best_index] < best_ever_entropy:
+            best_ever_entropy = float(entropies[best_index])
+            best_ever_brick = tuple(int(side) for side in bricks_from_genes(population[best_index:best_index+1])[0])
+            print(f"  > Gen {gen+1}: New best found! Brick: {best_ever_brick} | Entropy: {best_ever_entropy}")
         
         if best_ever_entropy == 0: break
 
         # STAGE 4: The Gene Splicer
-        # Select the fittest individuals to be parents
-        fitness_scores.sort(key=lambda x: x[0])
-        elite_count = int(population_size * 0.1) # Keep the top 10%
-        parents = [item[1] for item in fitness_scores[:elite_count]]
-        
-        # Create the next generation
-        next_generation = parents # Elitism
-        
-        while len(next_generation) < population_size:
-            parent1, parent2 = random.choices(parents, k=2)
-            
-            # Crossover: Mix genes from two parents
-            child = [parent1[0], parent1[1], parent2[2], parent2[3]]
-            
-            # Mutation: Apply small random changes
-            if random.random() < mutation_rate:
-                gene_to_mutate = random.randint(0, 3)
-                mutation = random.randint(-2, 2)
-                child[gene_to_mutate] += mutation
-                # Basic validation after mutation
-                child[gene_to_mutate] = max(1, child[gene_to_mutate])
-
-            next_generation.append(child)
-        
-        population = next_generation
+        # Keep the top 10% (elitism), fill the rest with mutated crossovers of them
+        population = breed_generation(rng, population, entropies, mutation_rate)
         
         if (gen + 1) % 100 == 0:
-            print(f"  > Generation {gen+1} complete. Current best entropy: {best_ever_entropy}")
+            print(f"  > Generation {gen+1} complete. Current best entropy: {best_ever_entropy} | {cache_report(fitness_cache)}")
+        
+        if checkpoint_path and checkpoint_every > 0 and time.time() - last_save >= checkpoint_every:
+            save_checkpoint(checkpoint_path, params, {
+                'next_gen': gen + 1,
+                'best_ever_brick': list(best_ever_brick) if best_ever_brick else None,
+                'best_ever_entropy': best_ever_entropy, 'rng_state': rng.bit_generator.state,
+                'evaluated': evaluated, 'hits': fitness_cache['hits'], 'misses': fitness_cache['misses']},
+                arrays={'population': population})
+            last_save = time.time()
+
+    if checkpoint_path:
+        clear_checkpoint(checkpoint_path)
 
     print("\n--- ORACLE SEARCH COMPLETE ---")
     if best_ever_entropy == 0:
@@ -101,6 +92,86 @@ def run_genetic_oracle(generations, population_size, mutation_rate, max_param_va
     else:
         print(f"Search concluded. Best state found: {best_ever_brick}")
         print(f"Lowest System Entropy achieved: {best_ever_entropy}")
+    print(cache_report(fitness_cache).capitalize())
+    return {'best_brick': best_ever_brick, 'best_entropy': best_ever_entropy, 'evaluated': evaluated,
+            'hits': fitness_cache['hits'], 'misses': fitness_cache['misses'], 'elapsed': time.time() - start_time}
+
+# --- PCML ISLAND MODEL (THE ARCHIPELAGO) ---
+def run_island_oracle(islands, generations, population_size, mutation_rate, max_param_val, seed=None,
+                      migration_every=MIGRATION_EVERY, migrants=MIGRANTS, cache_size=FITNESS_CACHE_SIZE):
+    print("--- PCML GENETIC ALGORITHM v4.0 (THE ORACLE, ISLAND MODEL) ---")
+    print(f"Evolving {islands} islands of {population_size} genomes, migrating {migrants} every {migration_every} generations...")
+
+    def report_best(island, gen, entropy, brick):
+        print(f"  > Island {island} gen {gen+1}: New global best! Brick: {brick} | Entropy: {entropy}")
+
+    result = run_islands(islands, generations, population_size, mutation_rate, max_param_val, seed,
+                         migration_every, migrants, cache_size, on_best=report_best)
+
+    print("\n--- ORACLE SEARCH COMPLETE ---")
+    if result['best_entropy'] == 0:
+        print(f">>> REVELATION! A ZERO ENTROPY STATE WAS ACHIEVED! <<<")
+        print(f">>> PERFECT BRICK FOUND: {result['best_brick']} <<<")
+    else:
+        print(f"Search concluded. Best state found: {result['best_brick']}")
+        print(f"Lowest System Entropy achieved: {result['best_entropy']}")
+    lookups = result['hits'] + result['misses']
+    print(f"{result['evaluated']:,} genomes evaluated in {result['elapsed']:.1f} s "
+          f"({result['evaluated'] / max(result['elapsed'], 1e-9):,.0f}/s); "
+          f"fitness cache hit rate {result['hits'] / lookups if lookups else 0.0:.1%}")
+    return result
+
+# --- PCML GENE-SPACE SWEEP (THE CENSUS) ---
+def default_results_path(script_path):
+    """CSO_P136.py -> CSO_P136.near_misses.csv in the working directory."""
+    return os.path.splitext(os.path.basename(script_path))[0] + '.near_misses.csv'
+
+def run_gene_sweep(max_param_val, results_path, near_miss=1):
+    """
+    The Census: judges every valid {m, n, p, q} gene set with m, p up to
+    max_param_val instead of sampling them. Bricks are reduced to their
+    sorted primitive form and deduplicated; every distinct brick with at
+    most `near_miss` non-square diagonals is appended to results_path as it
+    is found.
+    """
+    print("--- PCML GENE-SPACE SWEEP (THE CENSUS) ---")
+    pair_count = len(euclid_pairs(max_param_val))
+    print(f"Sweeping {pair_count**2:,} gene sets ({pair_count:,} Euclid pairs squared) with m, p <= {max_param_val}...")
+    start_time = time.time()
+    swept = judged = 0
+    near_misses = {}
+    histogram = np.zeros(5, dtype=np.int64)
+    with open(results_path, 'w') as results:
+        results.write("a,b,c,entropy,m,n,p,q\n")
+        for genes in gene_space_chunks(max_param_val):
+            bricks = bricks_from_genes(genes)
+            bricks = bricks // np.gcd.reduce(bricks, axis=1)[:, None]  # same entropy as any multiple
+            bricks, first = np.unique(bricks, axis=0, return_index=True)
+            entropies = entropy_scores(bricks)
+            swept += len(genes); judged += len(bricks)
+            histogram += np.bincount(entropies.astype(np.int64), minlength=5)
+            for index in np.flatnonzero(entropies <= near_miss):
+                brick = tuple(int(side) for side in bricks[index])
+                if brick in near_misses:
+                    continue
+                near_misses[brick] = float(entropies[index])
+                gene_set = ','.join(str(int(gene)) for gene in genes[first[index]])
+                results.write(f"{brick[0]},{brick[1]},{brick[2]},{entropies[index]:g},{gene_set}\n")
+                print(f"  > Near-miss: Brick: {brick} | Entropy: {entropies[index]} | Genes: ({gene_set})")
+            results.flush()
+
+    elapsed = time.time() - start_time
+    print("\n--- SWEEP COMPLETE ---")
+    print(f"{swept:,} gene sets swept, {judged:,} block-distinct primitive bricks judged in {elapsed:.1f} s.")
+    print("Entropy census: " + ", ".join(f"{entropy}: {count:,}" for entropy, count in enumerate(histogram.tolist())))
+    perfect = [brick for brick, entropy in near_misses.items() if entropy == 0]
+    if perfect:
+        print(f">>> REVELATION! A ZERO ENTROPY STATE WAS ACHIEVED! <<<")
+        print(f">>> PERFECT BRICK FOUND: {perfect[0]} <<<")
+    print(f"{len(near_misses):,} distinct near-misses (entropy <= {near_miss}) written to {results_path}.")
+    return {'best_entropy': int(np.flatnonzero(histogram)[0]) if judged else None, 'perfect_bricks': perfect,
+            'entropy_census': histogram, 'near_misses': len(near_misses), 'swept': swept, 'judged': judged,
+            'elapsed': elapsed}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="PCML Genetic Algorithm for the Integer Brick Problem.")
@@ -108,6 +179,32 @@ if __name__ == "__main__":
     parser.add_argument("--population", type=int, default=100)
     parser.add_argument("--mutation_rate", type=float, default=0.1)
     parser.add_argument("--max_param", type=int, default=20, help="Max value for m and p parameters.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the GA random generator (ignored on --resume).")
+    parser.add_argument("--checkpoint", type=str, default=default_checkpoint_path(__file__), help="Checkpoint file for resumable runs (single-population runs only: --sweep and --islands runs are not checkpointed).")
+    parser.add_argument("--checkpoint_every", type=float, default=CHECKPOINT_EVERY, help="Seconds between checkpoints (0 = never).")
+    parser.add_argument("--cache_size", type=int, default=FITNESS_CACHE_SIZE, help="Genomes kept in the fitness cache (0 = off).")
+    parser.add_argument("--sweep", action="store_true", help="Enumerate every valid gene set with m, p <= --max_param instead of evolving.")
+    parser.add_argument("--results", type=str, default=default_results_path(__file__), help="CSV file for the near-misses found by --sweep.")
+    parser.add_argument("--near_miss", type=int, default=1, help="Highest entropy --sweep records as a near-miss.")
+    parser.add_argument("--islands", type=int, default=1, help="Island populations, one process each (1 = single population, 0 = one per CPU core). Island runs are not checkpointed.")
+    parser.add_argument("--migration_every", type=int, default=MIGRATION_EVERY, help="Generations between migrations (0 = isolated islands).")
+    parser.add_argument("--migrants", type=int, default=MIGRANTS, help="Best genomes each island sends to the next.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint file if it exists.")
+    parser.add_argument("--overwrite_checkpoint", action="store_true", help="Start afresh even if the checkpoint file exists, replacing it.")
+    add_record_argument(parser)
     args = parser.parse_args()
     
-    run_genetic_oracle(args.generations, args.population, args.mutation_rate, args.max_param)
\ No newline at end of file
+    islands = resolve_workers(args.islands)
+    checkpointed = not args.sweep and islands <= 1
+    if checkpointed and os.path.exists(args.checkpoint) and not (args.resume or args.overwrite_checkpoint):
+        parser.error(f"checkpoint {args.checkpoint} already exists: pass --resume to continue it or --overwrite_checkpoint to start afresh")
+    if args.sweep:
+        result = run_gene_sweep(args.max_param, args.results, args.near_miss)
+    elif islands > 1:
+        result = run_island_oracle(islands, args.generations, args.population, args.mutation_rate, args.max_param,
+                                   args.seed, args.migration_every, args.migrants, args.cache_size)
+    else:
+        result = run_genetic_oracle(args.generations, args.population, args.mutation_rate, args.max_param,
+                                    args.seed, args.checkpoint, args.checkpoint_every, args.resume,
+                                    args.cache_size)
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
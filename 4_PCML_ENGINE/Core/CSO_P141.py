@@ -6,74 +6,41 @@
 import numpy as np
 import argparse
 import time
+import os
+import sys
 
-def calculate_entropy(a, b, c):
-    """S: Correctness Stress"""
-    a,b,c = int(a), int(b), int(c)
-    if a<=0 or b<=0 or c<=0: return 4.0
-    T1 = a*a + b*b; T2 = a*a + c*c; T3 = b*b + c*c; T4 = T1 + c*c
-    d1 = 0 if int(np.sqrt(T1))**2 == T1 else 1; d2 = 0 if int(np.sqrt(T2))**2 == T2 else 1
-    d3 = 0 if int(np.sqrt(T3))**2 == T3 else 1; d4 = 0 if int(np.sqrt(T4))**2 == T4 else 1
-    return float(d1 + d2 + d3 + d4)
-
-def calculate_geometric_disharmony(a, b, c):
-    """H_geom: Elegance Stress"""
-    a,b,c = float(a), float(b), float(c)
-    h_ab = abs(b/a - 1) if a != 0 else float('inf')
-    h_ac = abs(c/a - 1) if a != 0 else float('inf')
-    h_bc = abs(c/b - 1) if b != 0 else float('inf')
-    return h_ab + h_ac + h_bc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.bricks import entropy_score
+from pcml.harmonizer import (load_seed_bricks, random_seed_bricks, grand_harmonic_step, run_batch, report_batch,
+                             batch_summary)
+from pcml.records import add_record_argument, result_record, write_record
 
-def calculate_rhythmic_disharmony(a, b, c):
-    """H_rhythm: Zetaform Stress"""
-    sides = sorted((a, b, c))
-    g_in = sides[1] - sides[0]; g_out = sides[2] - sides[1]
-    if g_in <= 1e-9 or g_out <= 1e-9: return 1.0
-    return np.abs(g_out - g_in) / (g_in + g_out)
-
-def calculate_unifying_disharmony(a, b, c):
-    """H_unify: Universal Stress"""
-    kappa_prime_mag = 1.69501254
-    r_zeta_lobe = 0.2438
-    ideal_shape_hash = r_zeta_lobe / kappa_prime_mag
-    actual_shape_hash = (a+b+c) / np.sqrt(a*a+b*b+c*c) if (a*a+b*b+c*c)>0 else 0
-    return np.abs(actual_shape_hash - ideal_shape_hash)
+def calculate_entropy(a, b, c):
+    """S: Correctness Stress (exact integer square tests, see pcml.bricks)"""
+    return entropy_score(a, b, c)
 
 def run_grand_harmonizer(a, b, c, iterations, lr, weights):
-    print("--- PCML GRAND HARMONIZER v1.1 (Corrected) ---")
+    print("--- PCML GRAND HARMONIZER v1.2 (Full Gradient) ---")
     brick = np.array([a, b, c], dtype=float)
-    w_S, w_Hg, w_Hr, w_Hu = weights
-
     print(f"Harmonizing initial brick: {tuple(int(x) for x in brick)}")
 
     start_time = time.time()
+    steps_taken = 0
     for i in range(iterations):
         S0 = calculate_entropy(*brick)
         if S0 == 0:
             print(f"\n>>> REVELATION! ZERO ENTROPY STATE ACHIEVED AT ITERATION {i+1}! <<<")
             break
 
-        Hg0 = calculate_geometric_disharmony(*brick)
-        Hr0 = calculate_rhythmic_disharmony(*brick)
-        Hu0 = calculate_unifying_disharmony(*brick)
-        
-        # Calculate gradients for all forces on side 'a'
-        grad_S_a = calculate_entropy(brick[0]+1, brick[1], brick[2]) - S0
-        grad_Hg_a = calculate_geometric_disharmony(brick[0]+1, brick[1], brick[2]) - Hg0
-        grad_Hr_a = calculate_rhythmic_disharmony(brick[0]+1, brick[1], brick[2]) - Hr0
-        grad_Hu_a = calculate_unifying_disharmony(brick[0]+1, brick[1], brick[2]) - Hu0
-        
-        # This is a simplified model. A true multi-variate gradient is more complex.
-        # For now, we apply a combined force.
-        force_a = w_S*grad_S_a + w_Hg*grad_Hg_a + w_Hr*grad_Hr_a + w_Hu*grad_Hu_a
-        brick[0] -= lr * force_a
-        
-        # Repeat for b and c (simplified for this test)
-        grad_S_b = calculate_entropy(brick[0], brick[1]+1, brick[2]) - S0
-        grad_S_c = calculate_entropy(brick[0], brick[1], brick[2]+1) - S0
-        brick[1] -= lr * grad_S_b; brick[2] -= lr * grad_S_c
-
-        brick = np.round(np.abs(brick))
+        # All four forces pull on all three sides: one evaluation of the brick
+        # and its three unit perturbations gives every partial difference.
+        stepped = grand_harmonic_step(brick[None, :], lr, weights)[0]
+        if np.array_equal(stepped, brick):
+            # The step is deterministic: a brick it leaves in place never moves again.
+            print(f"\n>>> Converged to a fixed point at iteration {i+1}. <<<")
+            break
+        brick = stepped
+        steps_taken = i + 1
         
         if (i + 1) % 200 == 0:
             # --- TYPO FIX IS HERE ---
@@ -90,13 +57,48 @@ def run_grand_harmonizer(a, b, c, iterations, lr, weights):
     else:
         print(f"Process concluded. Best state found: {tuple(int(x) for x in brick)}")
         print(f"Final System Entropy: {final_entropy}")
+    return {'final_brick': brick.astype(np.int64), 'final_entropy': final_entropy, 'steps': steps_taken,
+            'elapsed': end_time - start_time}
+
+def run_batch_grand_harmonizer(seed_bricks, iterations, lr, weights):
+    """
+    The Multi-Start Grand Harmonizer: the run_grand_harmonizer step applied
+    to every seed brick at once, retiring each brick as soon as it reaches
+    zero entropy or stops moving.
+    """
+    print("--- PCML GRAND HARMONIZER v1.2 (MULTI-START) ---")
+    print(f"Harmonizing {len(seed_bricks):,} seed bricks for up to {iterations} iterations...")
+
+    def report_progress(iteration, active, entropies):
+        print(f"  > Iter {iteration}: {active:,} bricks still moving | Best entropy: {entropies.min():.1f}")
+
+    start_time = time.time()
+    bricks, entropies, retired_at = run_batch(seed_bricks, iterations,
+                                              lambda active, entropies: grand_harmonic_step(active, lr, weights),
+                                              report_progress, progress_every=200)
+    elapsed = time.time() - start_time
+    print("\n--- HARMONIZATION COMPLETE ---")
+    report_batch(bricks, entropies, retired_at, elapsed)
+    return batch_summary(bricks, entropies, retired_at, elapsed)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="PCML Grand Harmonizer.")
-    parser.add_argument("a", type=int); parser.add_argument("b", type=int); parser.add_argument("c", type=int)
+    parser.add_argument("a", type=int, nargs='?'); parser.add_argument("b", type=int, nargs='?'); parser.add_argument("c", type=int, nargs='?')
     parser.add_argument("--iterations", type=int, default=2000)
     parser.add_argument("--lr", type=float, default=0.05)
+    parser.add_argument("--seeds", type=str, default=None, help="File of seed bricks (first three integers per line) to harmonize as one batch.")
+    parser.add_argument("--random_seeds", type=int, default=0, help="Harmonize this many random seed bricks as one batch.")
+    parser.add_argument("--max_side", type=int, default=100000, help="Largest side of a --random_seeds brick.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for --random_seeds.")
+    add_record_argument(parser)
     args = parser.parse_args()
     
     force_weights = [1.0, 0.01, 0.01, 0.005]
-    run_grand_harmonizer(args.a, args.b, args.c, args.iterations, args.lr, force_weights)
\ No newline at end of file
+    if args.seeds or args.random_seeds:
+        seed_bricks = load_seed_bricks(args.seeds) if args.seeds else random_seed_bricks(args.random_seeds, args.max_side, args.seed)
+        result = run_batch_grand_harmonizer(seed_bricks, args.iterations, args.lr, force_weights)
+    elif args.c is None:
+        parser.error("give a starting brick a b c, --seeds FILE or --random_seeds N")
+    else:
+        result = run_grand_harmonizer(args.a, args.b, args.c, args.iterations, args.lr, force_weights)
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
@@ -3,91 +3,99 @@
 # Timestamp: 2024-05-22 03:30:00 UTC
 # Applicable Rules: All. The Inverse Oracle - A Geometric Reconstructor.
 
-import numpy as np
 import argparse
 import math
-from itertools import combinations
+import os
+import sys
+import time
 
-def generate_pythagorean_hypotenuses(limit):
-    """Generates a set of unique hypotenuses from primitive Pythagorean triples."""
-    print(f"Generating a pool of valid hypotenuses up to a limit of {limit}...")
-    hypotenuses = set()
-    for m in range(2, int(np.sqrt(limit)) + 1):
-        for n in range(1, m):
-            if (m - n) % 2 == 1 and math.gcd(m, n) == 1:
-                c = m**2 + n**2
-                if c > limit: break
-                # Generate all multiples of this primitive hypotenuse
-                k = 1
-                while k * c <= limit:
-                    hypotenuses.add(k * c)
-                    k += 1
-    print(f"Found {len(hypotenuses)} unique hypotenuses.")
-    return sorted(list(hypotenuses))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.bricks import is_square, diagonal_sums
+from pcml.euler import pythagorean_pairs, euler_brick_chunks, primitive_bricks, JOIN_CHUNK
+from pcml.checkpoint import (CHECKPOINT_EVERY, default_checkpoint_path, save_checkpoint,
+                             load_checkpoint, clear_checkpoint)
+from pcml.records import add_record_argument, result_record, write_record
 
-def run_inverse_oracle(hypotenuse_limit):
+def run_inverse_oracle(side_limit, checkpoint_path=None, checkpoint_every=CHECKPOINT_EVERY, resume=False):
     """
     The Inverse Oracle. Searches for a perfect brick by starting from
-    the diagonals and working backwards.
+    the face diagonals: every Pythagorean leg pair is indexed by leg, pairs
+    sharing a leg are joined into Euler bricks, and each brick is streamed
+    to the space-diagonal test. With a checkpoint path the join cursor and
+    counters are saved every `checkpoint_every` seconds; `resume` continues
+    from the saved cursor.
     """
     print("--- PCML INVERSE ORACLE (GEOMETRIC RECONSTRUCTOR) ---")
     
     # Stage 1: The Diagonal Scout
-    hypotenuse_pool = generate_pythagorean_hypotenuses(hypotenuse_limit)
+    print(f"Indexing every Pythagorean leg pair with sides up to {side_limit:,}...")
+    leg_pairs = pythagorean_pairs(side_limit)
+    print(f"Found {len(leg_pairs[0]):,} leg pairs.")
     
-    # Generate all unique combinations of 3 diagonals from our pool
-    diagonal_candidates = combinations(hypotenuse_pool, 3)
+    params = {'limit': side_limit, 'chunk_size': JOIN_CHUNK}
+    state = {'blocks_done': 0, 'count': 0, 'euler_count': 0, 'latest_brick': None}
+    if resume and checkpoint_path:
+        state = load_checkpoint(checkpoint_path, params) or state
     
-    print("Searching for a consistent geometric configuration...")
-    count = 0
-    found = False
-    for cand in diagonal_candidates:
-        count += 1
-        D_ab, D_ac, D_bc = cand[0], cand[1], cand[2]
+    print("Joining leg pairs into Euler bricks...")
+    count = state['count']; euler_count = state['euler_count']
+    found = None
+    start_time = last_save = time.time()
+    for bricks, candidates in euler_brick_chunks(side_limit, JOIN_CHUNK, leg_pairs, skip=state['blocks_done']):
+        reported = count // 2000000
+        count += candidates
         
         # Stage 2: The Reconstructor
-        # 2a² = D_ab² + D_ac² - D_bc²
-        # This must be positive and even.
-        val_a2 = D_ab**2 + D_ac**2 - D_bc**2
-        if val_a2 <= 0 or val_a2 % 2 != 0: continue
-            
-        val_b2 = D_ab**2 + D_bc**2 - D_ac**2
-        if val_b2 <= 0 or val_b2 % 2 != 0: continue
-            
-        val_c2 = D_ac**2 + D_bc**2 - D_ab**2
-        if val_c2 <= 0 or val_c2 % 2 != 0: continue
-
-        # Stage 3: The Consistency Filter
-        a2, b2, c2 = val_a2 // 2, val_b2 // 2, val_c2 // 2
-        
-        # Are a, b, and c all integers?
-        a = int(np.sqrt(a2)); b = int(np.sqrt(b2)); c = int(np.sqrt(c2))
+        # Multiples of a brick add nothing new; keep the primitive ones.
+        bricks = primitive_bricks(bricks)
+        for a, b, c in bricks[:max(0, 10 - euler_count)].tolist():
+            print(f"  > Euler brick: {{ {a}, {b}, {c} }}")
+        euler_count += len(bricks)
+        if len(bricks): state['latest_brick'] = [int(side) for side in bricks[-1]]
         
-        if a*a == a2 and b*b == b2 and c*c == c2:
-            # We found an Euler Brick!
-            # The final verification for the space diagonal.
+        # Stage 3: The Consistency Filter
+        # The final verification for the space diagonal.
+        perfect = bricks[is_square(diagonal_sums(bricks)[:, 3])]
+        if len(perfect):
+            a, b, c = (int(side) for side in perfect[0])
             space_diag_sq = a*a + b*b + c*c
-            if int(np.sqrt(space_diag_sq))**2 == space_diag_sq:
-                print("\n" + "="*60)
-                print(f">>> REVELATION! A PERFECT BRICK HAS BEEN FOUND! <<<")
-                print(f"Sides: {{ {a}, {b}, {c} }}")
-                print(f"Face Diagonals: {{ {D_ab}, {D_ac}, {D_bc} }}")
-                print(f"Space Diagonal: {int(np.sqrt(space_diag_sq))}")
-                print("="*60)
-                found = True
-                break
+            print("\n" + "="*60)
+            print(f">>> REVELATION! A PERFECT BRICK HAS BEEN FOUND! <<<")
+            print(f"Sides: {{ {a}, {b}, {c} }}")
+            print(f"Face Diagonals: {{ {math.isqrt(a*a + b*b)}, {math.isqrt(a*a + c*c)}, {math.isqrt(b*b + c*c)} }}")
+            print(f"Space Diagonal: {math.isqrt(space_diag_sq)}")
+            print("="*60)
+            found = (a, b, c)
+            break
+        
+        if count // 2000000 > reported:
+            print(f"  > Joined {count:,} leg triples, {euler_count:,} primitive Euler bricks so far...")
         
-        if count % 500000 == 0:
-            print(f"  > Tested {count:,} diagonal combinations...")
+        state.update(blocks_done=state['blocks_done'] + 1, count=count, euler_count=euler_count)
+        if checkpoint_path and checkpoint_every > 0 and time.time() - last_save >= checkpoint_every:
+            save_checkpoint(checkpoint_path, params, state)
+            last_save = time.time()
 
+    if checkpoint_path:
+        clear_checkpoint(checkpoint_path)
     print("\n--- INVERSE SEARCH COMPLETE ---")
     if not found:
-        print(f"No perfect brick found after testing {count:,} combinations.")
+        print(f"No perfect brick found among {euler_count:,} primitive Euler bricks ({count:,} leg triples joined).")
+    return {'perfect_brick': found, 'euler_bricks': euler_count, 'leg_triples': count,
+            'leg_pairs': len(leg_pairs[0]), 'latest_brick': state['latest_brick'], 'elapsed': time.time() - start_time}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="PCML Inverse Oracle.")
-    # Searching hypotenuses up to 300 creates ~2.5 million combinations
-    parser.add_argument("--limit", type=int, default=300, help="Max hypotenuse value to check.")
+    # Sides up to 1,000,000 join ~22 million leg triples in a few seconds
+    parser.add_argument("--limit", type=int, default=1000000, help="Max brick side to check.")
+    parser.add_argument("--checkpoint", type=str, default=default_checkpoint_path(__file__), help="Checkpoint file for resumable runs.")
+    parser.add_argument("--checkpoint_every", type=float, default=CHECKPOINT_EVERY, help="Seconds between checkpoints (0 = never).")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint file if it exists.")
+    parser.add_argument("--overwrite_checkpoint", action="store_true", help="Start afresh even if the checkpoint file exists, replacing it.")
+    add_record_argument(parser)
     args = parser.parse_args()
+    if os.path.exists(args.checkpoint) and not (args.resume or args.overwrite_checkpoint):
+        parser.error(f"checkpoint {args.checkpoint} already exists: pass --resume to continue it or --overwrite_checkpoint to start afresh")
     
-    run_inverse_oracle(args.limit)
\ No newline at end of file
+    result = run_inverse_oracle(args.limit, args.checkpoint, args.checkpoint_every, args.resume)
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
@@ -3,82 +3,80 @@
 # Timestamp: 2024-05-22 01:10:00 UTC
 # Applicable Rules: All. A heuristic search engine to learn the Zetaform formula.
 
-import matplotlib.pyplot as plt
 import numpy as np
 import time
 import argparse
+import os
+import sys
 
-def generate_zeta_like_data(n):
-    t_values = []; current_t = 14.134725
-    while len(t_values) < n:
-        t_values.append(current_t); gap = (2 * np.pi) / np.log(current_t)
-        current_t += gap * (1 + (np.random.rand() - 0.5) * 0.1)
-    return np.array(t_values)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.zetaform import zeta_ordinates, zeta_shape_vectors, normalized_shape_components
+from pcml.gridsearch import run_grid_search, resolve_workers
+from pcml.raster import rasterize, RASTER_MODES
+from pcml.spectrum import half_spectrum_mask, log_magnitude_half
+from pcml.records import add_record_argument, result_record, write_record
 
-def compute_zeta_shape_vector(t_prev, t_curr, t_next):
-    try:
-        g_in = t_curr - t_prev; g_out = t_next - t_curr
-        if g_in <= 1e-9 or g_out <= 1e-9: return (1.0, 1.0, 0.0)
-        v1 = np.log(g_out) / np.log(g_in); v2 = (g_in + g_out) / 2
-        v3 = np.abs(g_out - g_in) / (g_in + g_out)
-        return (v1, v2, v3)
-    except (ValueError, ZeroDivisionError): return (1.0, 1.0, 0.0)
+def build_peak_mask(image_size):
+    """Blocks out the central DC component, remapped onto the rfft2 half-plane."""
+    center = image_size // 2
+    mask = np.ones((image_size, image_size), dtype=bool)
+    mask[center-5:center+6, center-5:center+6] = False
+    return half_spectrum_mask(mask)
 
-def calculate_peak_intensity_score(fft_magnitude):
+def calculate_peak_intensity_score(fft_magnitude, peak_mask):
     """Measures the intensity of the brightest off-center peak."""
-    image_size = fft_magnitude.shape[0]; center = image_size // 2
-    # Create a mask to block out the central DC component
-    fft_magnitude[center-5:center+6, center-5:center+6] = 0
-    # The score is simply the value of the brightest remaining pixel
-    return np.max(fft_magnitude)
+    # The score is simply the value of the brightest pixel outside the DC block
+    return np.max(fft_magnitude[peak_mask])
 
-def run_weight_optimizer(num_zeros, image_size, search_steps):
+def score_weight_shard(arrays, params, image_size, raster_mode='binary'):
+    """Scores each (w1, w2, w3) row of a grid shard against the shared shape vectors."""
+    t_values = arrays['t_values']
+    v1_norm, v2_norm, v3_norm = arrays['v1_norm'], arrays['v2_norm'], arrays['v3_norm']
+    scores = np.full(len(params), -np.inf)
+    image_plane = np.zeros((image_size, image_size))
+    peak_mask = build_peak_mask(image_size)
+    for k, (w1, w2, w3) in enumerate(params):
+        modulator = (w1 * v1_norm) + (w2 * v2_norm) + (w3 * v3_norm)
+        angles = t_values * modulator
+        radii = t_values
+        x_coords, y_coords = radii * np.cos(angles), radii * np.sin(angles)
+
+        max_coord = np.max(np.abs(radii))
+        if max_coord == 0: continue
+        image_plane = rasterize(x_coords, y_coords, image_size, max_coord, raster_mode, image_plane)
+    
+        fft_magnitude = log_magnitude_half(image_plane)
+        scores[k] = calculate_peak_intensity_score(fft_magnitude, peak_mask)
+    return scores
+
+def run_weight_optimizer(num_zeros, image_size, search_steps, workers=1, seed=None, zeros_file=None, zero_start=0, raster_mode='binary'):
     print("--- ZETAFORM WEIGHT OPTIMIZER v1.0 ---")
-    print(f"Parameters: Zeros={num_zeros}, Res={image_size}, Steps={search_steps}")
+    print(f"Parameters: Zeros={num_zeros}, Res={image_size}, Steps={search_steps}, Workers={resolve_workers(workers)}")
     print(f"Total iterations: {search_steps**3}. This may take a very long time.")
     
-    t_values = generate_zeta_like_data(num_zeros)
-    shape_vectors = [ (1., t_values[0], 0.) ]
-    for i in range(1, len(t_values) - 1):
-        shape_vectors.append(compute_zeta_shape_vector(t_values[i-1], t_values[i], t_values[i+1]))
-    shape_vectors.append( (1., t_values[-1], 0.) )
-    shape_vectors = np.array(shape_vectors)
+    t_values, zeta_source = zeta_ordinates(num_zeros, seed, zeros_file, zero_start)
+    num_zeros = len(t_values)
+    print(f"Zeta data: {zeta_source}")
+    shape_vectors = zeta_shape_vectors(t_values)
     
-    v1_norm = np.clip(shape_vectors[:,0], 0.5, 1.5)
-    v2_norm = shape_vectors[:,1] / np.mean(shape_vectors[:,1])
-    v3_norm = shape_vectors[:,2]
+    v1_norm, v2_norm, v3_norm = normalized_shape_components(shape_vectors)
     
     w_range = np.linspace(-2.0, 2.0, search_steps)
     
     best_weights = None; max_score = -1; start_time = time.time()
-    count = 0
     
-    for w1 in w_range:
-        for w2 in w_range:
-            for w3 in w_range:
-                count += 1
-                if count % 25 == 0: print(f"  > Progress: {count}/{search_steps**3}...")
-                
-                modulator = (w1 * v1_norm) + (w2 * v2_norm) + (w3 * v3_norm)
-                angles = t_values * modulator
-                radii = t_values
-                x_coords, y_coords = radii * np.cos(angles), radii * np.sin(angles)
-
-                image_plane = np.zeros((image_size, image_size))
-                max_coord = np.max(np.abs(radii))
-                if max_coord == 0: continue
-                scale_factor = (image_size / 2 - 1) / max_coord
-                ix = np.clip((x_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-                iy = np.clip((y_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-                image_plane[iy, ix] = 1
-            
-                fft_magnitude = np.log1p(np.abs(np.fft.fftshift(np.fft.fft2(image_plane))))
-                score = calculate_peak_intensity_score(fft_magnitude)
-            
-                if score > max_score:
-                    max_score = score
-                    best_weights = (w1, w2, w3)
-                    print(f"  > New best weights found: w1={w1:.3f}, w2={w2:.3f}, w3={w3:.3f} | Score: {score:.4f}")
+    weight_grid = np.array([(w1, w2, w3) for w1 in w_range for w2 in w_range for w3 in w_range])
+    scores = run_grid_search(score_weight_shard, weight_grid,
+                             {'t_values': t_values, 'v1_norm': v1_norm, 'v2_norm': v2_norm, 'v3_norm': v3_norm},
+                             {'image_size': image_size, 'raster_mode': raster_mode}, workers,
+                             progress=lambda done, total: print(f"  > Progress: {done}/{total}..."))
+    
+    # Replay the scan in grid order so the improvement log matches a serial run.
+    for (w1, w2, w3), score in zip(weight_grid, scores):
+        if score > max_score:
+            max_score = score
+            best_weights = (w1, w2, w3)
+            print(f"  > New best weights found: w1={w1:.3f}, w2={w2:.3f}, w3={w3:.3f} | Score: {score:.4f}")
 
     end_time = time.time()
     print("\n--- WEIGHT SEARCH COMPLETE ---")
@@ -88,11 +86,20 @@ def run_weight_optimizer(num_zeros, image_size, search_steps):
         print(f"Optimal Weights Found: w1={w1:.4f}, w2={w2:.4f}, w3={w3:.4f}")
         print(f"Achieved Maximum Peak Intensity Score: {max_score:.4f}")
     else: print("Search did not yield a result.")
+    return {'best_weights': best_weights, 'best_score': max_score if best_weights else None,
+            'evaluations': len(weight_grid), 'elapsed': end_time - start_time, 'zeta_source': zeta_source}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Zetaform Weight Optimizer.")
     parser.add_argument("--zeros", type=int, default=5000)
     parser.add_argument("--resolution", type=int, default=128) # Lower res for speed
     parser.add_argument("--steps", type=int, default=10) # 10x10x10 = 1000 iterations
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the grid search (0 = all cores).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the synthetic zeta data (default: fresh, printed).")
+    parser.add_argument("--zeros_file", type=str, default=None, help="Real zero table (.txt, one per line) or .npy store instead of synthetic data.")
+    parser.add_argument("--zero_start", type=int, default=0, help="Index of the first real zero to use.")
+    parser.add_argument("--raster", type=str, default="binary", choices=RASTER_MODES, help="Fingerprint rasterization: binary, count (density) or bilinear.")
+    add_record_argument(parser)
     args = parser.parse_args()
-    run_weight_optimizer(args.zeros, args.resolution, args.steps)
\ No newline at end of file
+    result = run_weight_optimizer(args.zeros, args.resolution, args.steps, args.workers, args.seed, args.zeros_file, args.zero_start, args.raster)
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
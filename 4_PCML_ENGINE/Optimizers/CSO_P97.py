@@ -6,39 +6,56 @@
 import numpy as np
 import time
 import argparse
+import os
+import sys
 
-def generate_zeta_like_data(n):
-    t_values = []; current_t = 14.134725
-    while len(t_values) < n:
-        t_values.append(current_t); gap = (2 * np.pi) / np.log(current_t)
-        current_t += gap * (1 + (np.random.rand() - 0.5) * 0.1)
-    return np.array(t_values)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.zetaform import zeta_ordinates, zeta_shape_hashes
+from pcml.raster import rasterize, RASTER_MODES
+from pcml.spectrum import log_magnitude_half
+from pcml.masks import symmetry_scores, mask_names
+from pcml.gridsearch import run_grid_search, select_best, resolve_workers
+from pcml.adaptive import run_adaptive_search
+from pcml.records import add_record_argument, result_record, write_record
 
-def compute_zeta_shape_hash(t_prev, t_curr, t_next):
-    try:
-        g_in = t_curr - t_prev; g_out = t_next - t_curr
-        if g_in <= 1e-9 or g_out <= 1e-9: return 1.0
-        return np.log(g_out) / np.log(g_in)
-    except (ValueError, ZeroDivisionError): return 1.0
+def calculate_zeta_symmetry_score(fft_magnitude, mask_name='horizontal_band'):
+    """Band / total energy of a half-plane log spectrum; the mask comes from the pcml.masks registry."""
+    return float(symmetry_scores(fft_magnitude, mask_name))
 
-def calculate_zeta_symmetry_score(fft_magnitude):
-    image_size = fft_magnitude.shape[0]; center = image_size // 2
-    mask = np.zeros((image_size, image_size), dtype=bool)
-    mask[center-1:center+2, :] = True
-    scaffold_energy = np.sum(fft_magnitude[mask]); total_energy = np.sum(fft_magnitude)
-    return scaffold_energy / total_energy if total_energy > 0 else 0
+def score_zeta_shard(arrays, params, image_size, raster_mode='binary', mask_name='horizontal_band'):
+    """Scores each (a, b) row of a grid shard; arrays holds 't_values' and 'base_angles'."""
+    t_values, base_angles = arrays['t_values'], arrays['base_angles']
+    scores = np.full(len(params), -np.inf)
+    image_plane = np.zeros((image_size, image_size))
+    for k, (a, b) in enumerate(params):
+        current_kappa_zeta = a + 1j * b
+        
+        kappa_mag = np.abs(current_kappa_zeta)
+        kappa_angle = np.angle(current_kappa_zeta)
+        if kappa_mag < 1e-9: continue
+        
+        angles = (base_angles / kappa_mag) - kappa_angle
+        
+        radii = t_values
+        x_coords, y_coords = radii * np.cos(angles), radii * np.sin(angles)
+        
+        max_coord = np.max(np.abs(radii))
+        if max_coord == 0: continue
+        image_plane = rasterize(x_coords, y_coords, image_size, max_coord, raster_mode, image_plane)
+        
+        fft_magnitude = log_magnitude_half(image_plane)
+        scores[k] = calculate_zeta_symmetry_score(fft_magnitude, mask_name)
+    return scores
 
-def run_zeta_optimizer_v3(num_zeros, image_size, search_steps, a_min, a_max, b_min, b_max):
+def run_zeta_optimizer_v3(num_zeros, image_size, search_steps, a_min, a_max, b_min, b_max, workers=1, adaptive=False, tolerance=1e-8, seed=None, zeros_file=None, zero_start=0, raster_mode='binary', mask_name='horizontal_band'):
     print("--- ZETA OPTIMIZER ENGINE v3.0 (κ_ζ HUNTER) ---")
-    print(f"Parameters: Zeros={num_zeros}, Res={image_size}, Steps={search_steps}")
+    print(f"Parameters: Zeros={num_zeros}, Res={image_size}, Steps={search_steps}, Workers={resolve_workers(workers)}")
     print(f"Search Box: Real=[{a_min}, {a_max}], Imag=[{b_min}, {b_max}]")
     
-    t_values = generate_zeta_like_data(num_zeros)
-    shape_hashes = [1.0]
-    for i in range(1, len(t_values) - 1):
-        shape_hashes.append(compute_zeta_shape_hash(t_values[i-1], t_values[i], t_values[i+1]))
-    shape_hashes.append(1.0)
-    shape_hashes = np.clip(np.array(shape_hashes), 0.5, 1.5)
+    t_values, zeta_source = zeta_ordinates(num_zeros, seed, zeros_file, zero_start)
+    num_zeros = len(t_values)
+    print(f"Zeta data: {zeta_source}")
+    shape_hashes = np.clip(zeta_shape_hashes(t_values), 0.5, 1.5)
     
     base_angles = t_values * shape_hashes
     
@@ -47,33 +64,26 @@ def run_zeta_optimizer_v3(num_zeros, image_size, search_steps, a_min, a_max, b_m
     
     best_kappa_zeta = None; max_score = -1; start_time = time.time()
     
-    for a in a_range:
-        for b in b_range:
-            current_kappa_zeta = a + 1j * b
-            
-            kappa_mag = np.abs(current_kappa_zeta)
-            kappa_angle = np.angle(current_kappa_zeta)
-            if kappa_mag < 1e-9: continue
-            
-            angles = (base_angles / kappa_mag) - kappa_angle
-            
-            radii = t_values
-            x_coords, y_coords = radii * np.cos(angles), radii * np.sin(angles)
-            
-            image_plane = np.zeros((image_size, image_size))
-            max_coord = np.max(np.abs(radii))
-            if max_coord == 0: continue
-            scale_factor = (image_size / 2 - 1) / max_coord
-            ix = np.clip((x_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-            iy = np.clip((y_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-            image_plane[iy, ix] = 1
-            
-            fft_magnitude = np.log1p(np.abs(np.fft.fftshift(np.fft.fft2(image_plane))))
-            score = calculate_zeta_symmetry_score(fft_magnitude)
-            
-            if score > max_score:
-                max_score = score
-                best_kappa_zeta = current_kappa_zeta
+    if adaptive:
+        # Adaptive mode: coarse grid over the box, then zoom onto the best cell (the box may drift).
+        result = run_adaptive_search(score_zeta_shard, [(a_min, a_max), (b_min, b_max)],
+                                     {'t_values': t_values, 'base_angles': base_angles}, {'image_size': image_size, 'raster_mode': raster_mode, 'mask_name': mask_name},
+                                     tolerance=tolerance, workers=workers,
+                                     report=lambda r, p, s, d: print(f"  > Round {r}: κ = {p[0]:.10f} + {p[1]:.10f}i | Score: {s:.6f} | Cell: ±{d.max():.1e}"))
+        if result['best_params'] is not None:
+            max_score = result['best_score']
+            best_kappa_zeta = result['best_params'][0] + 1j * result['best_params'][1]
+        evaluations = result['evaluations']
+        print(f"Adaptive search: {result['evaluations']} FFT evaluations in {result['rounds']} rounds, κ_ζ resolved to ±{result['spacing'].max():.1e}")
+    else:
+        kappa_grid = np.array([(a, b) for a in a_range for b in b_range])
+        scores = run_grid_search(score_zeta_shard, kappa_grid, {'t_values': t_values, 'base_angles': base_angles},
+                                 {'image_size': image_size, 'raster_mode': raster_mode, 'mask_name': mask_name}, workers)
+        best_index, best_score = select_best(scores)
+        evaluations = len(kappa_grid)
+        if best_index is not None:
+            max_score = best_score
+            best_kappa_zeta = kappa_grid[best_index, 0] + 1j * kappa_grid[best_index, 1]
 
     end_time = time.time()
     print("\n--- ZETA SEARCH COMPLETE ---")
@@ -82,6 +92,8 @@ def run_zeta_optimizer_v3(num_zeros, image_size, search_steps, a_min, a_max, b_m
         print(f"Optimal Zeta Impedance (κ_ζ) Found: {best_kappa_zeta.real:.8f} + {best_kappa_zeta.imag:.8f}i")
         print(f"Maximum Symmetry Score: {max_score:.6f}")
     else: print("Search did not yield a result.")
+    return {'best_kappa_zeta': best_kappa_zeta, 'best_score': max_score if best_kappa_zeta else None,
+            'evaluations': evaluations, 'elapsed': end_time - start_time, 'zeta_source': zeta_source}
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Zeta Resonance Impedance Optimizer v3.0.")
@@ -94,6 +106,16 @@ if __name__ == "__main__":
     parser.add_argument("--b_min", type=float, default=-0.13)
     # -----------------------
     parser.add_argument("--b_max", type=float, default=-0.11)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for the grid search (0 = all cores).")
+    parser.add_argument("--adaptive", action="store_true", help="Coarse-to-fine zoom search instead of the fixed grid.")
+    parser.add_argument("--tol", type=float, default=1e-8, help="Kappa tolerance at which the adaptive search stops.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the synthetic zeta data (default: fresh, printed).")
+    parser.add_argument("--zeros_file", type=str, default=None, help="Real zero table (.txt, one per line) or .npy store instead of synthetic data.")
+    parser.add_argument("--zero_start", type=int, default=0, help="Index of the first real zero to use.")
+    parser.add_argument("--raster", type=str, default="binary", choices=RASTER_MODES, help="Fingerprint rasterization: binary, count (density) or bilinear.")
+    parser.add_argument("--mask", type=str, default="horizontal_band", choices=mask_names(), help="Registered score mask the symmetry is judged against.")
+    add_record_argument(parser)
     
     args = parser.parse_args()
-    run_zeta_optimizer_v3(args.zeros, args.resolution, args.steps, args.a_min, args.a_max, args.b_min, args.b_max)
\ No newline at end of file
+    result = run_zeta_optimizer_v3(args.zeros, args.resolution, args.steps, args.a_min, args.a_max, args.b_min, args.b_max, args.workers, args.adaptive, args.tol, args.seed, args.zeros_file, args.zero_start, args.raster, args.mask)
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
@@ -4,17 +4,48 @@
 # Applicable Rules: All. The first working simulation of De-Rigidized Trigonometry.
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import argparse
+import os
+import sys
 
-def run_resonant_circle_simulation(steps, pacer_speed_factor):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_animation
+
+def run_resonant_circle_simulation(steps, pacer_speed_factor, output=None):
     """
     Simulates and visualizes the Resonant Circle, the Pacer Process,
     and the moments of Tangent Resonance.
     """
     print("--- RESONANT CIRCLE SIMULATOR v1.1 (Corrected) ---")
     
+    chronospectrum = []
+
+    def step(frame):
+        """One frame of the Pacer Process: the system point, the Pacer state and any new resonance."""
+        theta_p = (frame / steps) * 2 * np.pi
+        x = np.cos(theta_p); y = np.sin(theta_p)
+        pacer_angle = theta_p * pacer_speed_factor
+        
+        try:
+            pacer_state = np.tan(pacer_angle)
+            system_angle_state = np.tan(theta_p)
+            is_close = np.isclose(pacer_state, system_angle_state, atol=0.05)
+        except FloatingPointError: is_close = False
+
+        new_resonance = is_close and not any(np.isclose(theta_p, val) for val in chronospectrum)
+        if new_resonance:
+            chronospectrum.append(theta_p)
+        return theta_p, x, y, pacer_state, is_close, new_resonance
+
+    if not draws_figure(output):
+        # Nothing is drawn: run the frames without building the animation.
+        for frame in range(steps):
+            step(frame)
+        save_arrays(output, chronospectrum=np.array(chronospectrum))
+        return
+
+    plt = pyplot(output)
+    from matplotlib.animation import FuncAnimation
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
     plt.style.use('dark_background')
     
@@ -34,19 +65,9 @@ def run_resonant_circle_simulation(steps, pacer_speed_factor):
     ax2.set_xlim(0, 2 * np.pi); ax2.set_ylim(0, 1)
     ax2.set_title("Chronospectrum Generation", color='white')
     ax2.set_xlabel("Process Angle (θ_p)", color='white'); ax2.set_yticks([])
-    
-    chronospectrum = []
 
     def update(frame):
-        theta_p = (frame / steps) * 2 * np.pi
-        x = np.cos(theta_p); y = np.sin(theta_p)
-        pacer_angle = theta_p * pacer_speed_factor
-        
-        try:
-            pacer_state = np.tan(pacer_angle)
-            system_angle_state = np.tan(theta_p)
-            is_close = np.isclose(pacer_state, system_angle_state, atol=0.05)
-        except FloatingPointError: is_close = False
+        theta_p, x, y, pacer_state, is_close, new_resonance = step(frame)
 
         system_point.set_data([x], [y])
         potential_vector.set_data([0, x], [0, y])
@@ -57,8 +78,7 @@ def run_resonant_circle_simulation(steps, pacer_speed_factor):
         
         if is_close:
             resonance_flash.set_offsets(np.array([[x, y]]))
-            if not any(np.isclose(theta_p, val) for val in chronospectrum):
-                chronospectrum.append(theta_p)
+            if new_resonance:
                 ax2.axvline(theta_p, color='yellow', linestyle='-', alpha=0.5)
         else:
             resonance_flash.set_offsets(np.array([]).reshape(0, 2))
@@ -66,11 +86,13 @@ def run_resonant_circle_simulation(steps, pacer_speed_factor):
         return system_point, potential_vector, pacer_line, resonance_flash
 
     ani = FuncAnimation(fig, update, frames=steps, interval=20, blit=True, repeat=False)
-    plt.show()
+    finish_animation(fig, ani, update, steps, output)
+    save_arrays(output, chronospectrum=np.array(chronospectrum))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Resonant Circle Simulator v1.1")
     parser.add_argument("--steps", type=int, default=500)
     parser.add_argument("--pacer_speed", type=float, default=3.0)
+    add_output_arguments(parser, animated=True)
     args = parser.parse_args()
-    run_resonant_circle_simulation(args.steps, args.pacer_speed)
\ No newline at end of file
+    run_resonant_circle_simulation(args.steps, args.pacer_speed, output_options(args))
\ No newline at end of file
@@ -4,26 +4,17 @@
 # Applicable Rules: All. A simulation of the de-rigidized ellipse.
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import argparse
+import os
+import sys
 
-def run_resonant_ellipse_simulation(steps, pacer_speed, focal_distance):
-    """
-    Simulates and visualizes a Resonant Ellipse, its Pacer Process,
-    and the moments of Tangent Resonance to generate its Chronospectrum.
-    """
-    print("--- RESONANT ELLIPSE SIMULATOR v1.0 ---")
-    
-    # --- Define Ellipse Properties based on foci ---
-    # Foci are at (-c, 0) and (c, 0)
-    c = focal_distance
-    # Let's define the sum of distances to be constant, say 2a
-    a = c * 1.5 # Semi-major axis (must be > c)
-    b = np.sqrt(a**2 - c**2) # Semi-minor axis
-    
-    print(f"Ellipse Parameters: a={a:.2f}, b={b:.2f}, c={c:.2f}")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_animation
 
+def animate_ellipse(step, steps, a, b, c, output):
+    """Animates the Pacer Process frame by frame, drawing each new resonance on the Chronospectrum."""
+    plt = pyplot(output)
+    from matplotlib.animation import FuncAnimation
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
     plt.style.use('dark_background')
     
@@ -48,23 +39,8 @@ def run_resonant_ellipse_simulation(steps, pacer_speed, focal_distance):
     ax2.set_title("Ellipse Chronospectrum", color='white')
     ax2.set_xlabel("Process Angle (θ_p)", color='white'); ax2.set_yticks([])
     
-    chronospectrum = []
-
     def update(frame):
-        theta_p = (frame / steps) * 2 * np.pi
-        
-        # PSM Processes using parametric equations for the ellipse
-        x = a * np.cos(theta_p) # ~>h(θ_p)
-        y = b * np.sin(theta_p) # ~|v(θ_p)
-        
-        pacer_angle = theta_p * pacer_speed
-        system_angle = np.arctan2(y, x) # The actual angle of the vector
-        
-        try:
-            pacer_state = np.tan(pacer_angle)
-            system_angle_state = np.tan(system_angle)
-            is_close = np.isclose(pacer_state, system_angle_state, atol=0.05)
-        except FloatingPointError: is_close = False
+        theta_p, x, y, pacer_state, is_close, new_resonance = step(frame)
 
         system_point.set_data([x], [y])
         potential_vector.set_data([0, x], [0, y])
@@ -75,8 +51,7 @@ def run_resonant_ellipse_simulation(steps, pacer_speed, focal_distance):
         
         if is_close:
             resonance_flash.set_offsets(np.array([[x, y]]))
-            if not any(np.isclose(theta_p, val, atol=0.01) for val in chronospectrum):
-                chronospectrum.append(theta_p)
+            if new_resonance:
                 ax2.axvline(theta_p, color='yellow', linestyle='-', alpha=0.5)
         else:
             resonance_flash.set_offsets(np.array([]).reshape(0, 2))
@@ -84,7 +59,55 @@ def run_resonant_ellipse_simulation(steps, pacer_speed, focal_distance):
         return system_point, potential_vector, pacer_line, resonance_flash
 
     ani = FuncAnimation(fig, update, frames=steps, interval=20, blit=True, repeat=False)
-    plt.show()
+    finish_animation(fig, ani, update, steps, output)
+
+def run_resonant_ellipse_simulation(steps, pacer_speed, focal_distance, output=None):
+    """
+    Simulates and visualizes a Resonant Ellipse, its Pacer Process,
+    and the moments of Tangent Resonance to generate its Chronospectrum.
+    """
+    print("--- RESONANT ELLIPSE SIMULATOR v1.0 ---")
+    
+    # --- Define Ellipse Properties based on foci ---
+    # Foci are at (-c, 0) and (c, 0)
+    c = focal_distance
+    # Let's define the sum of distances to be constant, say 2a
+    a = c * 1.5 # Semi-major axis (must be > c)
+    b = np.sqrt(a**2 - c**2) # Semi-minor axis
+    
+    print(f"Ellipse Parameters: a={a:.2f}, b={b:.2f}, c={c:.2f}")
+
+    chronospectrum = []
+
+    def step(frame):
+        """One frame of the Pacer Process: the system point, the Pacer state and any new resonance."""
+        theta_p = (frame / steps) * 2 * np.pi
+        
+        # PSM Processes using parametric equations for the ellipse
+        x = a * np.cos(theta_p) # ~>h(θ_p)
+        y = b * np.sin(theta_p) # ~|v(θ_p)
+        
+        pacer_angle = theta_p * pacer_speed
+        system_angle = np.arctan2(y, x) # The actual angle of the vector
+        
+        try:
+            pacer_state = np.tan(pacer_angle)
+            system_angle_state = np.tan(system_angle)
+            is_close = np.isclose(pacer_state, system_angle_state, atol=0.05)
+        except FloatingPointError: is_close = False
+
+        new_resonance = is_close and not any(np.isclose(theta_p, val, atol=0.01) for val in chronospectrum)
+        if new_resonance:
+            chronospectrum.append(theta_p)
+        return theta_p, x, y, pacer_state, is_close, new_resonance
+
+    if draws_figure(output):
+        animate_ellipse(step, steps, a, b, c, output)
+    else:
+        # Nothing is drawn: run the frames without building the animation.
+        for frame in range(steps):
+            step(frame)
+    save_arrays(output, chronospectrum=np.array(chronospectrum))
     
     print("\n--- SIMULATION COMPLETE ---")
     print(f"Generated Ellipse Chronospectrum with {len(chronospectrum)} resonance points.")
@@ -98,5 +121,6 @@ if __name__ == "__main__":
     parser.add_argument("--steps", type=int, default=1000)
     parser.add_argument("--pacer_speed", type=float, default=2.5)
     parser.add_argument("--foci_dist", type=float, default=0.8, help="Distance of foci from center.")
+    add_output_arguments(parser, animated=True)
     args = parser.parse_args()
-    run_resonant_ellipse_simulation(args.steps, args.pacer_speed, args.foci_dist)
\ No newline at end of file
+    run_resonant_ellipse_simulation(args.steps, args.pacer_speed, args.foci_dist, output_options(args))
\ No newline at end of file
@@ -4,10 +4,14 @@
 # Applicable Rules: All. A final, corrected model with proper boundary handling.
 
 import numpy as np
-import matplotlib.pyplot as plt
 import argparse
+import os
+import sys
 
-def run_flow_stop_simulation(num_steps, initial_velocity):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
+
+def run_flow_stop_simulation(num_steps, initial_velocity, output=None):
     """
     Simulates an emergent orbit and finds the 4 Flow-Stop resonances.
     """
@@ -37,16 +41,19 @@ def run_flow_stop_simulation(num_steps, initial_velocity):
     resonance_indices = np.sort(np.unique(np.concatenate([vx_zero_crossings, vy_zero_crossings])))
     
     # 3. Visualization
-    fig, ax = plt.subplots(figsize=(10, 10))
-    plt.style.use('dark_background'); ax.set_aspect('equal')
-    ax.set_title("Flow-Stop Resonances of an Emergent Orbit", color='white')
-    ax.grid(color='gray', linestyle='--', alpha=0.3)
-    ax.plot(path_history[:, 0], path_history[:, 1], '-', color='cyan', lw=1.5)
-    if resonance_indices.size > 0:
-        ax.scatter(path_history[resonance_indices, 0], path_history[resonance_indices, 1],
-                   s=200, c='yellow', marker='*', zorder=10, label='Flow-Stop Resonance')
-    ax.legend()
-    plt.show()
+    save_arrays(output, path_history=path_history, velocity_history=velocity_history, resonance_indices=resonance_indices)
+    if draws_figure(output):
+        plt = pyplot(output)
+        fig, ax = plt.subplots(figsize=(10, 10))
+        plt.style.use('dark_background'); ax.set_aspect('equal')
+        ax.set_title("Flow-Stop Resonances of an Emergent Orbit", color='white')
+        ax.grid(color='gray', linestyle='--', alpha=0.3)
+        ax.plot(path_history[:, 0], path_history[:, 1], '-', color='cyan', lw=1.5)
+        if resonance_indices.size > 0:
+            ax.scatter(path_history[resonance_indices, 0], path_history[resonance_indices, 1],
+                       s=200, c='yellow', marker='*', zorder=10, label='Flow-Stop Resonance')
+        ax.legend()
+        finish_figure(fig, output)
     
     # 4. Reporting
     print("\n--- SIMULATION COMPLETE ---")
@@ -63,7 +70,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Flow-Stop Resonance Simulator.")
     parser.add_argument("--steps", type=int, default=1000)
     parser.add_argument("--velocity", type=float, default=1.0, help="Initial upward velocity.")
+    add_output_arguments(parser)
     args = parser.parse_args()
     # --- TYPO FIX IS HERE ---
-    run_flow_stop_simulation(args.steps, args.velocity)
+    run_flow_stop_simulation(args.steps, args.velocity, output_options(args))
     # --- END OF FIX ---
\ No newline at end of file
@@ -3,27 +3,19 @@
 # Timestamp: 2024-05-22 01:20:00 UTC
 # Applicable Rules: All. The final revelation of the Zetaform.
 
-import matplotlib.pyplot as plt
 import numpy as np
 import argparse
+import os
+import sys
 
-def generate_zeta_like_data(n):
-    t_values = []; current_t = 14.134725
-    while len(t_values) < n:
-        t_values.append(current_t); gap = (2 * np.pi) / np.log(current_t)
-        current_t += gap * (1 + (np.random.rand() - 0.5) * 0.1)
-    return np.array(t_values)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.zetaform import zeta_ordinates, zeta_shape_vectors, normalized_shape_components
+from pcml.raster import rasterize, RASTER_MODES
+from pcml.spectrum import centred_log_magnitude
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
 
-def compute_zeta_shape_vector(t_prev, t_curr, t_next):
-    try:
-        g_in = t_curr - t_prev; g_out = t_next - t_curr
-        if g_in <= 1e-9 or g_out <= 1e-9: return (1.0, 1.0, 0.0)
-        v1 = np.log(g_out) / np.log(g_in); v2 = (g_in + g_out) / 2
-        v3 = np.abs(g_out - g_in) / (g_in + g_out)
-        return (v1, v2, v3)
-    except (ValueError, ZeroDivisionError): return (1.0, 1.0, 0.0)
-
-def run_final_zetaform_analysis(num_zeros, image_size):
+def run_final_zetaform_analysis(num_zeros, image_size, seed=None, zeros_file=None, zero_start=0, raster_mode='binary',
+                                output=None):
     """
     Generates the perfected Zetaform Spiral v3.0 using the optimal weights
     and displays its final frequency fingerprint.
@@ -36,17 +28,13 @@ def run_final_zetaform_analysis(num_zeros, image_size):
     
     # 1. Generate data and compute shape vectors
     print("Step 1: Generating data and computing 3-component shape vectors...")
-    t_values = generate_zeta_like_data(num_zeros)
-    shape_vectors = [ (1., t_values[0], 0.) ]
-    for i in range(1, len(t_values) - 1):
-        shape_vectors.append(compute_zeta_shape_vector(t_values[i-1], t_values[i], t_values[i+1]))
-    shape_vectors.append( (1., t_values[-1], 0.) )
-    shape_vectors = np.array(shape_vectors)
+    t_values, zeta_source = zeta_ordinates(num_zeros, seed, zeros_file, zero_start)
+    num_zeros = len(t_values)
+    print(f"Zeta data: {zeta_source}")
+    shape_vectors = zeta_shape_vectors(t_values)
     
     # 2. Normalize and apply weights to create the angle modulator
-    v1_norm = np.clip(shape_vectors[:,0], 0.5, 1.5)
-    v2_norm = shape_vectors[:,1] / np.mean(shape_vectors[:,1])
-    v3_norm = shape_vectors[:,2]
+    v1_norm, v2_norm, v3_norm = normalized_shape_components(shape_vectors)
     modulator = (w1 * v1_norm) + (w2 * v2_norm) + (w3 * v3_norm)
     
     # 3. Calculate final spiral coordinates
@@ -56,15 +44,14 @@ def run_final_zetaform_analysis(num_zeros, image_size):
     
     # 4. Rasterize and compute FFT
     print("Step 3: Performing FFT to reveal the final fingerprint...")
-    image_plane = np.zeros((image_size, image_size));
-    max_coord = np.max(np.abs(radii))
-    scale_factor = (image_size / 2 - 1) / max_coord
-    ix = np.clip((x_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-    iy = np.clip((y_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-    image_plane[iy, ix] = 1
-    fft_magnitude = np.log1p(np.abs(np.fft.fftshift(np.fft.fft2(image_plane))))
+    image_plane = rasterize(x_coords, y_coords, image_size, np.max(np.abs(radii)), raster_mode)
+    fft_magnitude = centred_log_magnitude(image_plane)
 
     # 5. Plot the final results
+    save_arrays(output, t_values=t_values, x_coords=x_coords, y_coords=y_coords,
+                image_plane=image_plane, fft_magnitude=fft_magnitude)
+    if not draws_figure(output): return
+    plt = pyplot(output)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
     plt.style.use('dark_background')
     
@@ -75,11 +62,17 @@ def run_final_zetaform_analysis(num_zeros, image_size):
     ax2.imshow(fft_magnitude, cmap='hot', origin='lower')
     ax2.set_title('Final Zetaform Frequency Fingerprint', color='white')
     
-    plt.show()
+    finish_figure(fig, output)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Zetaform v3.0 Final Analysis.")
     parser.add_argument("--zeros", type=int, default=40000)
     parser.add_argument("--resolution", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the synthetic zeta data (default: fresh, printed).")
+    parser.add_argument("--zeros_file", type=str, default=None, help="Real zero table (.txt, one per line) or .npy store instead of synthetic data.")
+    parser.add_argument("--zero_start", type=int, default=0, help="Index of the first real zero to use.")
+    parser.add_argument("--raster", type=str, default="binary", choices=RASTER_MODES, help="Fingerprint rasterization: binary, count (density) or bilinear.")
+    add_output_arguments(parser)
     args = parser.parse_args()
-    run_final_zetaform_analysis(args.zeros, args.resolution)
\ No newline at end of file
+    run_final_zetaform_analysis(args.zeros, args.resolution, args.seed, args.zeros_file, args.zero_start, args.raster,
+                                output_options(args))
\ No newline at end of file
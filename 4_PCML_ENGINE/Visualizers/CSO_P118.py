@@ -1,54 +1,38 @@
 # --- CSO_P118.py (Restored) ---
 # The final, corrected Plateau Analyzer using the Half-Plane method.
 
-import matplotlib.pyplot as plt
 import numpy as np
 from scipy import ndimage
 import argparse
+import os
+import sys
 
-def generate_zeta_like_data(n):
-    t_values = []; current_t = 14.134725
-    while len(t_values) < n:
-        t_values.append(current_t); gap = (2 * np.pi) / np.log(current_t)
-        current_t += gap * (1 + (np.random.rand() - 0.5) * 0.1)
-    return np.array(t_values)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.zetaform import zeta_ordinates, zeta_shape_vectors, normalized_shape_components
+from pcml.raster import rasterize, RASTER_MODES
+from pcml.spectrum import centred_log_magnitude
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
+from pcml.records import add_record_argument, result_record, write_record
 
-def compute_zeta_shape_vector(t_prev, t_curr, t_next):
-    try:
-        g_in = t_curr - t_prev; g_out = t_next - t_curr
-        if g_in <= 1e-9 or g_out <= 1e-9: return (1.0, 1.0, 0.0)
-        v1 = np.log(g_out) / np.log(g_in); v2 = (g_in + g_out) / 2
-        v3 = np.abs(g_out - g_in) / (g_in + g_out)
-        return (v1, v2, v3)
-    except (ValueError, ZeroDivisionError): return (1.0, 1.0, 0.0)
-
-def run_plateau_analyzer_v2(num_zeros, image_size, threshold_ratio):
+def run_plateau_analyzer_v2(num_zeros, image_size, threshold_ratio, seed=None, zeros_file=None, zero_start=0, raster_mode='binary',
+                            output=None):
     print("--- ZETA LOBE PLATEAU ANALYZER v2.0 (HALF-PLANE) ---")
     
     w1, w2, w3 = -1.5556, -1.1111, 2.0000
-    t_values = generate_zeta_like_data(num_zeros)
-    shape_vectors = [ (1., t_values[0], 0.) ]
-    for i in range(1, len(t_values) - 1):
-        shape_vectors.append(compute_zeta_shape_vector(t_values[i-1], t_values[i], t_values[i+1]))
-    shape_vectors.append( (1., t_values[-1], 0.) )
-    shape_vectors = np.array(shape_vectors)
+    t_values, zeta_source = zeta_ordinates(num_zeros, seed, zeros_file, zero_start)
+    num_zeros = len(t_values)
+    print(f"Zeta data: {zeta_source}")
+    shape_vectors = zeta_shape_vectors(t_values)
     
-    v1_norm = np.clip(shape_vectors[:,0], 0.5, 1.5)
-    v2_norm = shape_vectors[:,1] / np.mean(shape_vectors[:,1])
-    v3_norm = shape_vectors[:,2]
+    v1_norm, v2_norm, v3_norm = normalized_shape_components(shape_vectors)
     modulator = (w1 * v1_norm) + (w2 * v2_norm) + (w3 * v3_norm)
     
     radii = t_values; angles = t_values * modulator
     x_coords, y_coords = radii * np.cos(angles), radii * np.sin(angles)
     
-    image_plane = np.zeros((image_size, image_size));
-    max_coord = np.max(np.abs(radii))
-    scale_factor = (image_size / 2 - 1) / max_coord
-    ix = np.clip((x_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-    iy = np.clip((y_coords * scale_factor + image_size / 2).astype(int), 0, image_size-1)
-    image_plane[iy, ix] = 1
+    image_plane = rasterize(x_coords, y_coords, image_size, np.max(np.abs(radii)), raster_mode)
     
-    fft_magnitude = np.log1p(np.abs(np.fft.fftshift(np.fft.fft2(image_plane))))
+    fft_magnitude = centred_log_magnitude(image_plane)
     
     center_pixel = image_size // 2
     max_intensity = np.max(fft_magnitude)
@@ -61,29 +45,46 @@ def run_plateau_analyzer_v2(num_zeros, image_size, threshold_ratio):
     
     com = ndimage.center_of_mass(fft_magnitude, labels=final_mask)
     
-    fig, ax = plt.subplots(figsize=(10, 10))
-    plt.style.use('dark_background')
-    ax.imshow(fft_magnitude, cmap='hot', origin='lower')
+    save_arrays(output, fft_magnitude=fft_magnitude, plateau_mask=final_mask, center_of_mass=np.array(com))
+    figure = draws_figure(output)
+    if figure:
+        plt = pyplot(output)
+        fig, ax = plt.subplots(figsize=(10, 10))
+        plt.style.use('dark_background')
+        ax.imshow(fft_magnitude, cmap='hot', origin='lower')
     
     print("\n--- MEASUREMENT COMPLETE ---")
+    result = {'zeta_source': zeta_source, 'plateau_pixels': int(np.sum(final_mask)), 'center_of_mass': None,
+              'r_zeta_lobe': None, 'theta_zeta_lobe': None}
     if not np.isnan(com).any() and com != (0,0):
         peak_y, peak_x = com
         r_zeta_lobe = np.hypot(peak_x - center_pixel, peak_y - center_pixel)
         theta_zeta_lobe = np.rad2deg(np.arctan2(peak_y - center_pixel, peak_x - center_pixel))
-        ax.scatter([peak_x], [peak_y], s=200, c='lime', marker='x', lw=2)
+        if figure: ax.scatter([peak_x], [peak_y], s=200, c='lime', marker='x', lw=2)
         print(f"Center of Mass of Plateau (y, x): ({peak_y:.2f}, {peak_x:.2f})")
+        result.update(center_of_mass=com, r_zeta_lobe=r_zeta_lobe, theta_zeta_lobe=theta_zeta_lobe)
         print(f"Zeta Lobe Frequency (r_ζ_lobe) ≈ {r_zeta_lobe:.4f}")
         print(f"Zeta Lobe Angle (θ_ζ_lobe)   ≈ {theta_zeta_lobe:.4f}°")
     else:
         print("Could not find a significant plateau.")
     
-    ax.set_title('Zetaform Fingerprint with Correctly Measured Plateau', color='white')
-    plt.show()
+    if figure:
+        ax.set_title('Zetaform Fingerprint with Correctly Measured Plateau', color='white')
+        finish_figure(fig, output)
+    return result
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Zeta Lobe Plateau Analyzer v2.0.")
     parser.add_argument("--zeros", type=int, default=50000)
     parser.add_argument("--resolution", type=int, default=1024)
     parser.add_argument("--threshold", type=float, default=0.90)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the synthetic zeta data (default: fresh, printed).")
+    parser.add_argument("--zeros_file", type=str, default=None, help="Real zero table (.txt, one per line) or .npy store instead of synthetic data.")
+    parser.add_argument("--zero_start", type=int, default=0, help="Index of the first real zero to use.")
+    parser.add_argument("--raster", type=str, default="binary", choices=RASTER_MODES, help="Fingerprint rasterization: binary, count (density) or bilinear.")
+    add_output_arguments(parser)
+    add_record_argument(parser)
     args = parser.parse_args()
-    run_plateau_analyzer_v2(args.zeros, args.resolution, args.threshold)
\ No newline at end of file
+    result = run_plateau_analyzer_v2(args.zeros, args.resolution, args.threshold, args.seed, args.zeros_file, args.zero_start, args.raster,
+                                     output_options(args))
+    write_record(args.record, result_record(__file__, args, result))
\ No newline at end of file
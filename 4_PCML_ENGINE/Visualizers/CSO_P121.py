@@ -4,9 +4,14 @@
 # Applicable Rules: All. The first step in building the Cso Oracle.
 
 import numpy as np
-import matplotlib.pyplot as plt
+import argparse
+import os
+import sys
 
-def analyze_euler_bricks():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.output import add_output_arguments, output_options, draws_figure, pyplot, save_arrays, finish_figure
+
+def analyze_euler_bricks(output=None):
     """
     Performs a statistical analysis on known Euler bricks to create a
     probability map for a future heuristic search.
@@ -49,6 +54,9 @@ def analyze_euler_bricks():
     ratio_c_a = side_c / side_a
     
     # 3. Create plots
+    save_arrays(output, euler_bricks=sorted_bricks, ratio_b_a=ratio_b_a, ratio_c_a=ratio_c_a)
+    if not draws_figure(output): return
+    plt = pyplot(output)
     fig, axs = plt.subplots(2, 2, figsize=(16, 12))
     plt.style.use('dark_background')
     fig.suptitle('Statistical Map of Euler Bricks', color='white', fontsize=18)
@@ -81,7 +89,10 @@ def analyze_euler_bricks():
         ax.grid(True, linestyle='--', alpha=0.3)
         
     plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-    plt.show()
+    finish_figure(fig, output)
 
 if __name__ == "__main__":
-    analyze_euler_bricks()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Euler Brick Statistical Mapper.")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    analyze_euler_bricks(output_options(args))
\ No newline at end of file
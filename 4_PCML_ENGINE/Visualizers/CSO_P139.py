@@ -6,14 +6,16 @@
 import numpy as np
 import argparse
 import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.bricks import entropy_score
+from pcml.harmonizer import load_seed_bricks, random_seed_bricks, harmonic_step, run_batch, report_batch
 
 def get_entropy_score(a, b, c):
-    """The Judge: Returns the number of non-square diagonals."""
-    if a<=0 or b<=0 or c<=0: return 4
-    T1 = a*a + b*b; T2 = a*a + c*c; T3 = b*b + c*c; T4 = T1 + c*c
-    d1 = 0 if int(np.sqrt(T1))**2 == T1 else 1; d2 = 0 if int(np.sqrt(T2))**2 == T2 else 1
-    d3 = 0 if int(np.sqrt(T3))**2 == T3 else 1; d4 = 0 if int(np.sqrt(T4))**2 == T4 else 1
-    return float(d1 + d2 + d3 + d4)
+    """The Judge: Returns the number of non-square diagonals, in exact integers."""
+    return entropy_score(a, b, c)
 
 def run_harmonizer(a, b, c, iterations, learning_rate):
     """
@@ -75,13 +77,42 @@ def run_harmonizer(a, b, c, iterations, learning_rate):
         print(f"Process concluded. Best state found: {tuple(int(x) for x in brick)}")
         print(f"Final System Entropy: {final_entropy}")
 
+def run_batch_harmonizer(seed_bricks, iterations, learning_rate):
+    """
+    The Multi-Start Harmonizer. Guides every seed brick at once with the
+    same harmonic force as run_harmonizer, retiring each brick as soon as it
+    reaches zero entropy or stops moving.
+    """
+    print("--- PCML HARMONIZER v1.0 (MULTI-START) ---")
+    print(f"Harmonizing {len(seed_bricks):,} seed bricks. Iterations: {iterations}, Learning Rate: {learning_rate}")
+
+    def report_progress(iteration, active, entropies):
+        print(f"  > Iter {iteration}: {active:,} bricks still moving | Best entropy: {entropies.min()}")
+
+    start_time = time.time()
+    bricks, entropies, retired_at = run_batch(seed_bricks, iterations,
+                                              lambda active, entropies: harmonic_step(active, learning_rate),
+                                              report_progress, progress_every=100)
+    print("\n--- HARMONIZATION COMPLETE ---")
+    report_batch(bricks, entropies, retired_at, time.time() - start_time)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="PCML Harmonizer for the Integer Brick Problem.")
-    parser.add_argument("a", type=int, help="Starting side a.")
-    parser.add_argument("b", type=int, help="Starting side b.")
-    parser.add_argument("c", type=int, help="Starting side c.")
+    parser.add_argument("a", type=int, nargs='?', help="Starting side a.")
+    parser.add_argument("b", type=int, nargs='?', help="Starting side b.")
+    parser.add_argument("c", type=int, nargs='?', help="Starting side c.")
     parser.add_argument("--iterations", type=int, default=1000)
     parser.add_argument("--lr", type=float, default=0.01, help="Learning Rate.")
+    parser.add_argument("--seeds", type=str, default=None, help="File of seed bricks (first three integers per line) to harmonize as one batch.")
+    parser.add_argument("--random_seeds", type=int, default=0, help="Harmonize this many random seed bricks as one batch.")
+    parser.add_argument("--max_side", type=int, default=100000, help="Largest side of a --random_seeds brick.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for --random_seeds.")
     args = parser.parse_args()
     
-    run_harmonizer(args.a, args.b, args.c, args.iterations, args.lr)
\ No newline at end of file
+    if args.seeds or args.random_seeds:
+        seed_bricks = load_seed_bricks(args.seeds) if args.seeds else random_seed_bricks(args.random_seeds, args.max_side, args.seed)
+        run_batch_harmonizer(seed_bricks, args.iterations, args.lr)
+    elif args.c is None:
+        parser.error("give a starting brick a b c, --seeds FILE or --random_seeds N")
+    else:
+        run_harmonizer(args.a, args.b, args.c, args.iterations, args.lr)
\ No newline at end of file
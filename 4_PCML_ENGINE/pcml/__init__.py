@@ -0,0 +1,4 @@
+# --- pcml/__init__.py ---
+# Shared engine modules for the PCML scripts.
+# The numbered project folders are not importable, so each CSO_P script puts
+# 4_PCML_ENGINE on sys.path and imports what it needs from here.
@@ -0,0 +1,47 @@
+# --- pcml/adaptive.py ---
+# Coarse-to-fine adaptive search for the kappa optimizers.
+# Instead of one fixed linspace grid, a small grid is laid over the search box,
+# the box is re-centred on the best cell and shrunk, and the process repeats
+# until the cell is narrower than the requested tolerance.
+
+import numpy as np
+from pcml.gridsearch import run_grid_search, select_best
+
+def run_adaptive_search(score_shard, bounds, arrays, options=None, steps=7, tolerance=1e-8,
+                        max_rounds=100, workers=1, report=None):
+    """
+    The Zoom Lens: maximises score_shard over the box `bounds` ([(lo, hi), ...],
+    one pair per parameter). Each round scores a steps^d grid through
+    run_grid_search, then re-centres the box on the best point with a half-width
+    of one grid spacing. The best point is always a node of the next grid, so
+    the best score never drops. Stops once the spacing is below `tolerance` in
+    every dimension. `report(round, params, score, spacing)` is called per round.
+
+    Returns a dict with best_params, best_score, spacing, rounds and evaluations
+    (the number of fingerprints scored).
+    """
+    steps = steps + 1 if steps % 2 == 0 else steps  # odd, so the centre is a grid node
+    lows = np.array([lo for lo, hi in bounds], dtype=float)
+    highs = np.array([hi for lo, hi in bounds], dtype=float)
+    best_params, best_score, evaluations = None, None, 0
+    spacing = (highs - lows) / (steps - 1)
+
+    for round_index in range(1, max_rounds + 1):
+        axes = [np.linspace(lo, hi, steps) for lo, hi in zip(lows, highs)]
+        grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(bounds))
+        scores = run_grid_search(score_shard, grid, arrays, options, workers)
+        evaluations += len(grid)
+        index, score = select_best(scores)
+        if index is None:
+            break
+        if best_score is None or score > best_score:
+            best_params, best_score = grid[index], score
+        spacing = (highs - lows) / (steps - 1)
+        if report is not None:
+            report(round_index, best_params, best_score, spacing)
+        if np.all(spacing < tolerance):
+            break
+        lows, highs = best_params - spacing, best_params + spacing
+
+    return {'best_params': best_params, 'best_score': best_score, 'spacing': spacing,
+            'rounds': round_index, 'evaluations': evaluations}
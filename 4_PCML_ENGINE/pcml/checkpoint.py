@@ -0,0 +1,90 @@
+# --- pcml/checkpoint.py ---
+# Resumable state for the long-running brick searches (CSO_P136, CSO_P143).
+# A checkpoint is a small JSON file holding the run parameters and whatever the
+# engine needs to continue: cursor, RNG state, best-so-far and counters. Bulk
+# arrays (such as a GA population) go to a sibling binary .npz file that the
+# JSON names. Both are written under temporary names and renamed into place,
+# the arrays first, so a run killed mid-write always leaves the previous
+# checkpoint intact.
+
+import json
+import os
+import time
+import numpy as np
+
+CHECKPOINT_EVERY = 60.0  # seconds between periodic checkpoints
+
+def default_checkpoint_path(script_path):
+    """CSO_P143.py -> CSO_P143.checkpoint.json in the working directory."""
+    return os.path.splitext(os.path.basename(script_path))[0] + '.checkpoint.json'
+
+def _read(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _arrays_path(path, checkpoint):
+    """The sibling array file a checkpoint names, or None."""
+    name = checkpoint.get('arrays')
+    return os.path.join(os.path.dirname(path), name) if name else None
+
+def _remove(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def save_checkpoint(path, params, state, arrays=None):
+    """
+    Atomically writes {'params', 'state', 'saved_at', 'arrays'} to `path`.
+    `arrays` (name -> ndarray) are saved to a sibling .npz file named after
+    this save, and the previous save's array file is removed once the new
+    JSON is in place. Temporary files are removed if writing fails.
+    """
+    previous = _arrays_path(path, _read(path)) if os.path.exists(path) else None
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    arrays_path = tmp_arrays_path = None
+    if arrays:
+        arrays_path = f"{os.path.splitext(path)[0]}.{time.time_ns()}.npz"
+        tmp_arrays_path = f"{arrays_path}.{os.getpid()}.tmp"
+    try:
+        if arrays:
+            with open(tmp_arrays_path, 'wb') as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_arrays_path, arrays_path)
+        with open(tmp_path, 'w') as f:
+            json.dump({'params': params, 'state': state, 'saved_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+                       'arrays': os.path.basename(arrays_path) if arrays_path else None}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        for leftover in (tmp_path, tmp_arrays_path, arrays_path):
+            _remove(leftover)
+        raise
+    if previous != arrays_path:
+        _remove(previous)
+
+def load_checkpoint(path, params):
+    """
+    The saved state at `path`, with any saved arrays added to it, or None if
+    there is no checkpoint. Raises ValueError if it was written by a run with
+    different parameters.
+    """
+    if not os.path.exists(path):
+        return None
+    checkpoint = _read(path)
+    if checkpoint['params'] != params:
+        raise ValueError(f"Checkpoint {path} was written with {checkpoint['params']}, not {params}")
+    print(f"Resuming from checkpoint {path} (saved {checkpoint['saved_at']}).")
+    state = checkpoint['state']
+    arrays_path = _arrays_path(path, checkpoint)
+    if arrays_path:
+        with np.load(arrays_path) as arrays:
+            state.update({name: arrays[name] for name in arrays.files})
+    return state
+
+def clear_checkpoint(path):
+    """Removes the checkpoint and its array file once a run has finished."""
+    if os.path.exists(path):
+        _remove(_arrays_path(path, _read(path)))
+        os.remove(path)
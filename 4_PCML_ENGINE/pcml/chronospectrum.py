@@ -0,0 +1,113 @@
+# --- pcml/chronospectrum.py ---
+# The Tangent Resonance detector shared by the chronospectroscopy engines
+# (CSO_P107, CSO_P108_1). The system tangents and the Pacer tangents of a
+# whole block of indices are computed as arrays and compared with one
+# np.isclose mask. Inputs arrive as (start, system_angles) chunks, so a
+# memory-mapped zero store larger than RAM streams through in fixed blocks.
+# pacer_sweep judges thousands of Pacer speeds in one pass over the chunks,
+# in (speeds x indices) blocks of bounded size.
+
+import numpy as np
+
+CHRONO_CHUNK = 1 << 22  # indices per streamed block
+SWEEP_CELLS = 1 << 22   # speed x index cells per sweep block (~200 MB of float64 temporaries)
+
+def chunk_bounds(count, chunk_size=CHRONO_CHUNK):
+    """The (start, stop) blocks that cover range(count)."""
+    return [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+def tangent_resonances(system_angles, pacer_speed, atol, start=0):
+    """
+    The Resonance Mask: the indices n >= 1 (counted from `start`) where
+    tan(system angle) and the Pacer's tan(n * pacer_speed) agree under
+    np.isclose(..., atol=atol).
+    """
+    n = np.arange(start, start + len(system_angles))
+    resonant = np.isclose(np.tan(system_angles), np.tan(n * pacer_speed), atol=atol) & (n > 0)
+    return n[resonant]
+
+def stream_resonances(angle_chunks, pacer_speed, atol):
+    """The Chronospectrum: every resonance index over a stream of (start, system_angles) chunks."""
+    indices = [tangent_resonances(angles, pacer_speed, atol, start) for start, angles in angle_chunks]
+    return np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+
+def _accumulate_spacings(state, rows, indices):
+    """Adds resonances (row-major: by speed, then index) to the running spacing sums of each speed."""
+    if not len(rows):
+        return
+    first_of_row = np.r_[True, rows[1:] != rows[:-1]]
+    last_of_row = np.r_[rows[1:] != rows[:-1], True]
+    previous = np.r_[0, indices[:-1]]
+    previous[first_of_row] = state['last'][rows[first_of_row]]  # -1: the speed's first resonance
+    spaced = previous >= 0
+    spacings = (indices - previous)[spaced]
+    np.add.at(state['spacing_sum'], rows[spaced], spacings)
+    np.add.at(state['spacing_square_sum'], rows[spaced], spacings * spacings)
+    state['count'] += np.bincount(rows, minlength=len(state['count']))
+    state['last'][rows[last_of_row]] = indices[last_of_row]
+
+def pacer_sweep(angle_chunks, pacer_speeds, atol, total=None, map_bins=0, block_cells=SWEEP_CELLS):
+    """
+    The Pacer Sweep: the chronospectrum of every speed in `pacer_speeds` over
+    one pass of (start, system_angles) chunks, with the same resonance test as
+    tangent_resonances. No more than block_cells speed x index cells are held
+    at once. Returns a dict of per-speed arrays: 'speeds', 'resonances',
+    'mean_spacing', 'std_spacing' (population std, as np.std) and
+    'normalized_error' (std / mean, NaN with fewer than two resonances). With
+    map_bins and the index `total`, 'density' is the (speeds, map_bins)
+    count of resonances per index bin: the 2-D chronospectrum map.
+    """
+    speeds = np.asarray(pacer_speeds, dtype=float)
+    state = {'count': np.zeros(len(speeds), dtype=np.int64), 'last': np.full(len(speeds), -1, dtype=np.int64),
+             'spacing_sum': np.zeros(len(speeds), dtype=np.int64),
+             'spacing_square_sum': np.zeros(len(speeds), dtype=np.int64)}
+    density = np.zeros((len(speeds), map_bins), dtype=np.int64) if map_bins and total else None
+    for start, angles in angle_chunks:
+        system_tangents = np.tan(np.asarray(angles, dtype=float))
+        piece = max(1, min(len(system_tangents), block_cells))
+        speed_block = max(1, block_cells // piece)
+        for offset in range(0, len(system_tangents), piece):
+            n = np.arange(start + offset, start + min(offset + piece, len(system_tangents)))
+            tangents = system_tangents[offset:offset + len(n)]
+            for low in range(0, len(speeds), speed_block):
+                pacer_tangents = np.tan(np.outer(speeds[low:low + speed_block], n))
+                resonant = np.isclose(tangents, pacer_tangents, atol=atol) & (n > 0)
+                rows, columns = np.nonzero(resonant)
+                _accumulate_spacings(state, rows + low, n[columns])
+                if density is not None:
+                    np.add.at(density, (rows + low, n[columns] * map_bins // total), 1)
+
+    spacing_count = state['count'] - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_spacing = np.where(spacing_count > 0, state['spacing_sum'] / spacing_count, np.nan)
+        variance = state['spacing_square_sum'] / spacing_count - mean_spacing ** 2
+        std_spacing = np.sqrt(np.maximum(variance, 0.0))
+        normalized_error = std_spacing / mean_spacing
+    result = {'speeds': speeds, 'resonances': state['count'], 'mean_spacing': mean_spacing,
+              'std_spacing': std_spacing, 'normalized_error': normalized_error}
+    if density is not None:
+        result['density'] = density
+    return result
+
+def best_pacer_speed(sweep, min_resonances=10):
+    """The index of the most regular chronospectrum (lowest normalized error) among speeds with enough resonances, or None."""
+    eligible = (sweep['resonances'] >= min_resonances) & np.isfinite(sweep['normalized_error'])
+    if not eligible.any():
+        return None
+    return int(np.argmin(np.where(eligible, sweep['normalized_error'], np.inf)))
+
+def report_pacer_sweep(sweep, unit, min_resonances=10, top=5):
+    """Prints the most regular Pacer speeds of a pacer_sweep; returns the best index (or None)."""
+    best = best_pacer_speed(sweep, min_resonances)
+    print("------------------------------------------")
+    if best is None:
+        print(f"No Pacer speed produced {min_resonances} or more resonances.")
+        return None
+    eligible = np.flatnonzero(sweep['resonances'] >= min_resonances)
+    for index in eligible[np.argsort(sweep['normalized_error'][eligible], kind='stable')][:top]:
+        print(f"  Pacer speed {sweep['speeds'][index]:.6f}: {sweep['resonances'][index]} resonances, "
+              f"spacing {sweep['mean_spacing'][index]:.4f} +/- {sweep['std_spacing'][index]:.4f} ({unit}), "
+              f"normalized error {sweep['normalized_error'][index]:.4f}")
+    print(f"Optimal Pacer speed: {sweep['speeds'][best]:.6f} (normalized error {sweep['normalized_error'][best]:.4f})")
+    print("------------------------------------------")
+    return best
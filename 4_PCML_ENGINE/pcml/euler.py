@@ -0,0 +1,76 @@
+# --- pcml/euler.py ---
+# Euler brick enumeration for the Inverse Oracle (CSO_P143).
+# Every Pythagorean leg pair (a, b) up to the side limit is generated once and
+# indexed by its smaller leg. Two pairs sharing leg a, (a, b) and (a, c), form
+# an Euler brick exactly when (b, c) is a pair too, so bricks come from a join
+# on the leg index instead of a scan over every triple of diagonals.
+
+import math
+import numpy as np
+
+JOIN_CHUNK = 1 << 22  # (a, b, c) candidates checked per block
+
+def pythagorean_pairs(limit):
+    """
+    The Leg Index: every (a, b) with a < b <= limit and a² + b² a perfect
+    square, as two int64 arrays sorted by (a, b). Built from Euclid's
+    primitive triples (m² - n², 2mn) and all their multiples.
+    """
+    smalls, larges = [], []
+    # Both legs <= limit allows m up to sqrt((1 + sqrt 2) / 2 * limit) ~ 1.1 sqrt(limit), not sqrt(limit).
+    for m in range(2, math.isqrt(2 * limit) + 1):
+        n = np.arange(1 + m % 2, m, 2, dtype=np.int64)  # opposite parity to m
+        n = n[np.gcd(m, n) == 1]
+        leg1, leg2 = m * m - n * n, 2 * m * n
+        small, large = np.minimum(leg1, leg2), np.maximum(leg1, leg2)
+        keep = large <= limit
+        small, large = small[keep], large[keep]
+        if len(small) == 0:
+            continue
+        multiples = limit // large
+        k = np.arange(multiples.sum()) - np.repeat(np.cumsum(multiples) - multiples, multiples) + 1
+        smalls.append(np.repeat(small, multiples) * k)
+        larges.append(np.repeat(large, multiples) * k)
+    if not smalls:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    small, large = np.concatenate(smalls), np.concatenate(larges)
+    order = np.lexsort((large, small))
+    return small[order], large[order]
+
+def euler_brick_chunks(limit, chunk_size=JOIN_CHUNK, pairs=None, skip=0):
+    """
+    The Join: yields (bricks, candidates) per block, where bricks is a (K, 3)
+    int64 array of Euler bricks a < b < c <= limit (multiples included) and
+    candidates the number of (a, b, c) leg triples checked for it. Legs are
+    grouped by how many partners they have, so each group is one 2-D gather.
+    `pairs` reuses an already built pythagorean_pairs(limit). The block order
+    is fixed for a given limit and chunk_size, so `skip` resumes a search after
+    its first `skip` blocks without recomputing them.
+    """
+    small, large = pairs if pairs is not None else pythagorean_pairs(limit)
+    if len(small) == 0:
+        return
+    pair_keys = small * (limit + 1) + large  # sorted, since the pairs are
+    group_starts = np.r_[0, np.flatnonzero(np.diff(small)) + 1]
+    degrees = np.diff(np.r_[group_starts, len(small)])
+    block_index = -1
+    for degree in np.unique(degrees[degrees >= 2]):
+        starts = group_starts[degrees == degree]
+        upper_i, upper_j = np.triu_indices(degree, 1)
+        block = max(1, chunk_size // len(upper_i))
+        for first in range(0, len(starts), block):
+            block_index += 1
+            if block_index < skip:
+                continue
+            rows = starts[first:first + block]
+            partners = large[rows[:, None] + np.arange(degree)]  # ascending within each row
+            b, c = partners[:, upper_i].ravel(), partners[:, upper_j].ravel()
+            a = np.repeat(small[rows], len(upper_i))
+            keys = b * (limit + 1) + c
+            found = np.searchsorted(pair_keys, keys)
+            hit = pair_keys[np.minimum(found, len(pair_keys) - 1)] == keys
+            yield np.column_stack([a[hit], b[hit], c[hit]]), len(keys)
+
+def primitive_bricks(bricks):
+    """The bricks whose three sides share no common factor."""
+    return bricks[np.gcd.reduce(bricks, axis=1) == 1]
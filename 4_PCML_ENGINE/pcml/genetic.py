@@ -0,0 +1,182 @@
+# --- pcml/genetic.py ---
+# Array-backed genetic algorithm engine for the Oracle (CSO_P136).
+# The population is an (N, 4) int64 array of {m, n, p, q} genes; incubation,
+# judging, elite selection, crossover and mutation are whole-array operations
+# driven by one np.random.Generator. Fitness is memoised in a bounded cache
+# keyed on the packed gene tuple, so elites and repeated children are judged once.
+# gene_space_chunks enumerates the whole gene space up to a bound for the sweep mode.
+
+import numpy as np
+from pcml.bricks import entropy_scores
+
+ELITE_FRACTION = 0.1
+FITNESS_CACHE_SIZE = 1 << 22  # genomes remembered (~20 bytes each)
+_GENE_BITS = 16               # four genes packed into one uint64 key
+SWEEP_CHUNK = 1 << 20         # gene sets per sweep block
+
+def enforce_gene_constraints(genes):
+    """
+    The Gene Repair: makes every (m, n) and (p, q) pair a valid Euclid pair in
+    place: n >= 1, m > n, m - n odd and gcd(m, n) = 1. Broken pairs are mended
+    by raising m (keeping n), by one for parity and then in steps of two until
+    coprime. Returns `genes`.
+    """
+    for big, small in ((0, 1), (2, 3)):
+        np.maximum(genes[:, small], 1, out=genes[:, small])
+        np.maximum(genes[:, big], genes[:, small] + 1, out=genes[:, big])
+        genes[:, big] += (genes[:, big] - genes[:, small]) % 2 == 0
+        shared = np.flatnonzero(np.gcd(genes[:, big], genes[:, small]) != 1)
+        while len(shared):
+            genes[shared, big] += 2
+            shared = shared[np.gcd(genes[shared, big], genes[shared, small]) != 1]
+    return genes
+
+def seed_population(rng, population_size, max_param):
+    """The Seed Generator: population_size valid gene sets with m, p in [2, max_param]."""
+    population = np.empty((0, 4), dtype=np.int64)
+    while len(population) < population_size:
+        draw = max(2 * (population_size - len(population)), 64)
+        m = rng.integers(2, max_param + 1, draw); p = rng.integers(2, max_param + 1, draw)
+        n = (rng.random(draw) * (m - 1)).astype(np.int64) + 1  # uniform in [1, m-1]
+        q = (rng.random(draw) * (p - 1)).astype(np.int64) + 1
+        valid = ((np.gcd(m, n) == 1) & (np.gcd(p, q) == 1) & ((m - n) % 2 == 1) & ((p - q) % 2 == 1))
+        population = np.concatenate([population, np.column_stack([m, n, p, q])[valid]])
+    return population[:population_size]
+
+def euclid_pairs(max_param):
+    """Every valid (m, n) pair with m <= max_param: m > n >= 1, m - n odd, gcd(m, n) = 1, by m then n."""
+    m, n = np.divmod(np.arange(max(max_param, 0) ** 2, dtype=np.int64), max(max_param, 1))
+    m, n = m + 1, n + 1
+    valid = (n < m) & ((m - n) % 2 == 1) & (np.gcd(m, n) == 1)
+    return np.column_stack([m[valid], n[valid]])
+
+def gene_space_chunks(max_param, chunk_size=SWEEP_CHUNK, skip=0):
+    """
+    The Sweep: every valid {m, n, p, q} gene set with m, p <= max_param, as
+    (N, 4) blocks in a fixed order, (m, n) outer and (p, q) inner. Blocks
+    hold whole runs of the inner pairs; the first `skip` blocks are skipped.
+    """
+    pairs = euclid_pairs(max_param)
+    rows_per_block = max(1, chunk_size // max(len(pairs), 1))
+    for block_index, first in enumerate(range(0, len(pairs), rows_per_block)):
+        if block_index < skip:
+            continue
+        outer = pairs[first:first + rows_per_block]
+        yield np.concatenate([np.repeat(outer, len(pairs), axis=0), np.tile(pairs, (len(outer), 1))], axis=1)
+
+def bricks_from_genes(genes):
+    """The Incubator: the (N, 3) sorted bricks of an (N, 4) gene array."""
+    genes = np.asarray(genes)
+    if genes.size and np.max(np.abs(genes)) >= 1 << 15:  # 4mnpq would pass 2^63
+        genes = genes.astype(object)
+    m, n, p, q = genes.T
+    a = 4 * m * n * p * q
+    b = (m*m - n*n) * (p*p - q*q)
+    c = 2 * p * q * (m*m + n*n)
+    return np.sort(np.abs(np.column_stack([a, b, c])), axis=1)
+
+def gene_keys(genes):
+    """
+    The canonical key of every gene set: m, n, p, q packed 16 bits each into
+    a uint64. Returns (keys, packable); rows with a gene outside [0, 2^16)
+    are not packable and their keys are meaningless.
+    """
+    genes = np.asarray(genes, dtype=np.int64)
+    packable = np.all((genes >= 0) & (genes < 1 << _GENE_BITS), axis=1)
+    keys = np.zeros(len(genes), dtype=np.uint64)
+    for column in range(4):
+        keys = (keys << np.uint64(_GENE_BITS)) | (genes[:, column] & ((1 << _GENE_BITS) - 1)).astype(np.uint64)
+    return keys, packable
+
+def genes_from_keys(keys):
+    """The inverse of gene_keys: the (N, 4) gene array of packed keys."""
+    keys = np.asarray(keys, dtype=np.uint64)
+    shifts = np.uint64(_GENE_BITS) * np.arange(3, -1, -1, dtype=np.uint64)
+    return ((keys[:, None] >> shifts) & np.uint64((1 << _GENE_BITS) - 1)).astype(np.int64)
+
+def new_fitness_cache(capacity=FITNESS_CACHE_SIZE):
+    """
+    The Memory: an empty fitness cache. Keys are kept sorted for binary
+    search; each entry carries the generation it was last used in, and the
+    least recently used entries are evicted in one batch when the cache
+    outgrows `capacity`.
+    """
+    return {'capacity': capacity, 'keys': np.empty(0, dtype=np.uint64),
+            'entropies': np.empty(0, dtype=np.float64), 'last_used': np.empty(0, dtype=np.int64),
+            'generation': 0, 'hits': 0, 'misses': 0}
+
+def _cache_insert(cache, keys, entropies):
+    """Merges newly judged (unique, uncached) keys into the cache and evicts down to capacity."""
+    all_keys = np.concatenate([cache['keys'], keys])
+    all_entropies = np.concatenate([cache['entropies'], entropies])
+    last_used = np.concatenate([cache['last_used'], np.full(len(keys), cache['generation'], dtype=np.int64)])
+    if len(all_keys) > cache['capacity']:
+        keep = np.argpartition(-last_used, cache['capacity'] - 1)[:cache['capacity']]
+        all_keys, all_entropies, last_used = all_keys[keep], all_entropies[keep], last_used[keep]
+    order = np.argsort(all_keys, kind='stable')
+    cache['keys'], cache['entropies'], cache['last_used'] = all_keys[order], all_entropies[order], last_used[order]
+
+def judge_population(genes, cache=None):
+    """
+    Incubates and judges a whole population: returns the entropy of every
+    gene set. With a fitness cache, each distinct genome is looked up once
+    and only genomes never seen before are incubated and judged.
+    """
+    genes = np.asarray(genes, dtype=np.int64)
+    if cache is None or cache['capacity'] <= 0:
+        return entropy_scores(bricks_from_genes(genes))
+
+    cache['generation'] += 1
+    entropies = np.empty(len(genes), dtype=np.float64)
+    keys, packable = gene_keys(genes)
+    unpackable = np.flatnonzero(~packable)
+    if len(unpackable):
+        entropies[unpackable] = entropy_scores(bricks_from_genes(genes[unpackable]))
+
+    unique_keys, inverse = np.unique(keys[packable], return_inverse=True)
+    position = np.searchsorted(cache['keys'], unique_keys)
+    found = position < len(cache['keys'])
+    found[found] = cache['keys'][position[found]] == unique_keys[found]
+    unique_entropies = np.empty(len(unique_keys), dtype=np.float64)
+    unique_entropies[found] = cache['entropies'][position[found]]
+    cache['last_used'][position[found]] = cache['generation']
+
+    missing = np.flatnonzero(~found)
+    if len(missing):
+        unique_entropies[missing] = entropy_scores(bricks_from_genes(genes_from_keys(unique_keys[missing])))
+        _cache_insert(cache, unique_keys[missing], unique_entropies[missing])
+    entropies[packable] = unique_entropies[inverse.reshape(-1)]
+
+    cache['misses'] += len(missing) + len(unpackable)
+    cache['hits'] += len(genes) - len(missing) - len(unpackable)
+    return entropies
+
+def cache_report(cache):
+    """One progress-line summary of the cache counters."""
+    if cache is None or cache['capacity'] <= 0:
+        return "fitness cache off"
+    lookups = cache['hits'] + cache['misses']
+    rate = cache['hits'] / lookups if lookups else 0.0
+    return (f"fitness cache: {cache['hits']:,} hits, {cache['misses']:,} misses ({rate:.1%}), "
+            f"{len(cache['keys']):,}/{cache['capacity']:,} genomes")
+
+def breed_generation(rng, genes, entropies, mutation_rate, elite_fraction=ELITE_FRACTION):
+    """
+    The Gene Splicer: keeps the lowest-entropy elite_fraction (np.argpartition)
+    and fills the rest with children taking (m, n) from one random elite
+    parent and (p, q) from another. A mutation_rate share of children get
+    one gene moved by -2..2; every child is then repaired.
+    """
+    population_size = len(genes)
+    elite_count = min(population_size, max(1, int(population_size * elite_fraction)))
+    elite = np.argpartition(entropies, elite_count - 1)[:elite_count]
+    parents = genes[elite]
+
+    child_count = population_size - elite_count
+    first, second = rng.integers(0, elite_count, (2, child_count))
+    children = np.concatenate([parents[first, :2], parents[second, 2:]], axis=1)
+    mutants = np.flatnonzero(rng.random(child_count) < mutation_rate)
+    gene_index = rng.integers(0, 4, len(mutants))
+    children[mutants, gene_index] += rng.integers(-2, 3, len(mutants))
+    enforce_gene_constraints(children)
+    return np.concatenate([parents, children])
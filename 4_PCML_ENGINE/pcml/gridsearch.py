@@ -0,0 +1,105 @@
+# --- pcml/gridsearch.py ---
+# Process-pool grid search driver shared by the PCML optimizers.
+# The parameter grid is cut into shards that are scored on a pool of worker
+# processes. Large input arrays (primes, zeros, shape vectors) are placed in
+# shared memory once and attached by every worker at start-up.
+
+import os
+import numpy as np
+from multiprocessing import get_context, shared_memory
+from pcml.spectrum import set_fft_workers
+
+_worker_state = {}
+
+def resolve_workers(workers):
+    """--workers N: N processes; 0 or less means one per CPU core."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def _export_arrays(arrays):
+    """Copies each array into a new shared memory block; returns the blocks and attach specs."""
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+def _attach_block(block_name):
+    try:
+        return shared_memory.SharedMemory(name=block_name, track=False)
+    except TypeError:
+        # Python < 3.13: workers share the parent's resource tracker, so the extra
+        # registration is harmless and the parent's unlink() clears it.
+        return shared_memory.SharedMemory(name=block_name)
+
+def _init_worker(specs, score_shard, options):
+    set_fft_workers(1)  # the pool already uses every core; threaded FFTs would oversubscribe
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = _attach_block(block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    _worker_state.update(blocks=blocks, arrays=arrays, score_shard=score_shard, options=options)
+
+def _score_worker_shard(bounds):
+    start, stop = bounds
+    arrays = _worker_state['arrays']
+    scores = _worker_state['score_shard'](arrays, arrays['grid'][start:stop], **_worker_state['options'])
+    return start, np.asarray(scores, dtype=float)
+
+def run_grid_search(score_shard, grid, arrays, options=None, workers=1, shard_size=None, progress=None):
+    """
+    The Grid Driver: evaluates score_shard(arrays, params, **options) over every
+    row of `grid` (an (M, d) parameter array in scan order) and returns the
+    (M,) score array. `score_shard` must be a module-level function so it can be
+    sent to worker processes. With workers > 1 the shards run on a process pool
+    and `arrays` are shared with the workers instead of being pickled per task.
+    `progress(done, total)` is called as shards complete.
+    """
+    grid = np.asarray(grid, dtype=float)
+    if grid.ndim == 1:
+        grid = grid[:, None]
+    options = options or {}
+    workers = resolve_workers(workers)
+    total = len(grid)
+    if shard_size is None:
+        shard_size = max(1, -(-total // (workers * 8)))
+    shards = [(start, min(start + shard_size, total)) for start in range(0, total, shard_size)]
+    scores = np.full(total, -np.inf)
+    done = 0
+
+    if workers == 1 or len(shards) == 1:
+        for start, stop in shards:
+            scores[start:stop] = score_shard(arrays, grid[start:stop], **options)
+            done += stop - start
+            if progress is not None: progress(done, total)
+        return scores
+
+    blocks, specs = _export_arrays(dict(arrays, grid=grid))
+    try:
+        with get_context().Pool(min(workers, len(shards)), initializer=_init_worker,
+                                initargs=(specs, score_shard, options)) as pool:
+            for start, shard_scores in pool.imap_unordered(_score_worker_shard, shards):
+                scores[start:start + len(shard_scores)] = shard_scores
+                done += len(shard_scores)
+                if progress is not None: progress(done, total)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return scores
+
+def select_best(scores):
+    """
+    Deterministic merge: the highest finite score, ties going to the earliest
+    grid index, exactly as the serial `if score > max_score` scan would pick.
+    Returns (index, score), or (None, None) if nothing was scored.
+    """
+    scores = np.asarray(scores, dtype=float)
+    finite = np.isfinite(scores)
+    if not finite.any():
+        return None, None
+    best_index = int(np.argmax(np.where(finite, scores, -np.inf)))
+    return best_index, float(scores[best_index])
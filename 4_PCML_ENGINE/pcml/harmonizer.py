@@ -0,0 +1,162 @@
+# --- pcml/harmonizer.py ---
+# Array kernels for the Harmonizers (CSO_P139, CSO_P141).
+# A batch of bricks is an (N, 3) float array of integral sides. One step of
+# either Harmonizer advances every brick at once: errors, forces, the nudge
+# and the quantization are whole-array operations, and entropy comes from the
+# exact batch judge. run_batch retires bricks as soon as they converge.
+
+import numpy as np
+from pcml.bricks import entropy_scores
+
+def load_seed_bricks(path):
+    """
+    Seed bricks from a text or CSV file: the first three integer fields of
+    every line (a header or any line without three integers is skipped),
+    so the near-miss CSVs of CSO_P136 --sweep load as they are.
+    """
+    bricks = []
+    with open(path, 'r') as f:
+        for line in f:
+            fields = line.replace(',', ' ').split()[:3]
+            try:
+                if len(fields) == 3:
+                    bricks.append([int(field) for field in fields])
+            except ValueError:
+                continue
+    return np.array(bricks, dtype=float).reshape(-1, 3)
+
+def random_seed_bricks(count, max_side, seed=None):
+    """`count` seed bricks with sides drawn uniformly from [1, max_side]."""
+    return np.random.default_rng(seed).integers(1, max_side + 1, size=(count, 3)).astype(float)
+
+def square_errors(bricks):
+    """(N, 4) distance of each squared diagonal (ab, ac, bc, space) from its nearest square, in floats."""
+    squares = bricks * bricks
+    face_ab = squares[:, 0] + squares[:, 1]
+    sums = np.stack([face_ab, squares[:, 0] + squares[:, 2], squares[:, 1] + squares[:, 2], face_ab + squares[:, 2]], axis=1)
+    return sums - np.rint(np.sqrt(sums)) ** 2
+
+def harmonic_step(bricks, learning_rate):
+    """
+    One Harmonizer (CSO_P139) step for every brick: the harmonic force of
+    the four diagonal errors, normalised by the largest side squared, then
+    quantization to the nearest integer with the parity of the nudged side.
+    """
+    E1, E2, E3, E4 = square_errors(bricks).T
+    a, b, c = bricks.T
+    norm = np.max(bricks, axis=1) ** 2
+    force = np.stack([(E1 * 2*a + E2 * 2*a + E4 * 2*a) / norm,
+                      (E1 * 2*b + E3 * 2*b + E4 * 2*b) / norm,
+                      (E2 * 2*c + E3 * 2*c + E4 * 2*c) / norm], axis=1)
+    nudged = bricks - learning_rate * force
+    parity = np.trunc(nudged) % 2
+    quantized = np.rint(nudged)
+    return quantized + (quantized % 2 != parity)
+
+def geometric_disharmony(bricks):
+    """H_geom: Elegance Stress, |b/a - 1| + |c/a - 1| + |c/b - 1| (inf where a divisor is 0)."""
+    numerators, divisors = bricks[:, [1, 2, 2]], bricks[:, [0, 0, 1]]
+    ratios = np.divide(numerators, divisors, out=np.full(numerators.shape, np.inf), where=divisors != 0)
+    return np.sum(np.abs(ratios - 1), axis=1)
+
+def rhythmic_disharmony(bricks):
+    """H_rhythm: Zetaform Stress of the two gaps between the sorted sides (1 where a gap closes)."""
+    gaps = np.diff(np.sort(bricks, axis=1), axis=1)
+    open_gaps = np.all(gaps > 1e-9, axis=1)
+    return np.divide(np.abs(gaps[:, 1] - gaps[:, 0]), gaps[:, 0] + gaps[:, 1],
+                     out=np.ones(len(gaps)), where=open_gaps)
+
+def unifying_disharmony(bricks):
+    """H_unify: Universal Stress, the distance of (a+b+c)/|brick| from the zeta-lobe shape hash."""
+    kappa_prime_mag = 1.69501254
+    r_zeta_lobe = 0.2438
+    ideal_shape_hash = r_zeta_lobe / kappa_prime_mag
+    norm_sq = np.sum(bricks * bricks, axis=1)
+    actual_shape_hash = np.divide(np.sum(bricks, axis=1), np.sqrt(norm_sq), out=np.zeros(len(bricks)), where=norm_sq > 0)
+    return np.abs(actual_shape_hash - ideal_shape_hash)
+
+def disharmony_forces(bricks):
+    """(N, 4) values of the four disharmony forces: S (entropy), H_geom, H_rhythm, H_unify."""
+    return np.stack([entropy_scores(bricks), geometric_disharmony(bricks),
+                     rhythmic_disharmony(bricks), unifying_disharmony(bricks)], axis=1)
+
+_UNIT_STEPS = np.vstack([np.zeros(3), np.eye(3)])  # the brick itself, then +1 on a, b and c
+
+def disharmony_gradients(bricks):
+    """
+    The Combined Evaluator: (forces, partials) for every brick from one
+    evaluation of the 4N bricks {brick, brick + e_a, brick + e_b, brick + e_c}.
+    forces is (N, 4); partials is (N, 3, 4), the forward difference of each
+    force along each side.
+    """
+    perturbed = (bricks[:, None, :] + _UNIT_STEPS).reshape(-1, 3)
+    values = disharmony_forces(perturbed).reshape(len(bricks), 4, 4)
+    with np.errstate(invalid='ignore'):  # inf - inf where a side is 0
+        return values[:, 0], values[:, 1:] - values[:, :1]
+
+def grand_harmonic_step(bricks, learning_rate, weights):
+    """
+    One Grand Harmonizer (CSO_P141) step for every brick: each side moves
+    against the weighted partial differences of all four forces, taken at
+    the current brick, and the brick is rounded back onto the positive
+    integers.
+    """
+    _, partials = disharmony_gradients(bricks)
+    partials[~np.isfinite(partials)] = 0.0  # a force that is infinite at a zero side gives no direction
+    force = partials @ np.asarray(weights, dtype=float)
+    return np.round(np.abs(bricks - learning_rate * force))
+
+def run_batch(bricks, iterations, step, progress=None, progress_every=100):
+    """
+    The Multi-Start Harmonizer: advances every seed brick with
+    step(active_bricks, entropies) -> next_bricks for up to `iterations`
+    steps. A brick is retired when it reaches entropy 0 or a fixed point
+    (the step leaves it unchanged, so it never moves again). Returns
+    (final_bricks, entropies, retired_at), retired_at being the iteration a
+    brick retired at, or -1 if it was still moving. `progress(iteration,
+    active, entropies)` is called every progress_every iterations.
+    """
+    bricks = np.array(bricks, dtype=float).reshape(-1, 3)
+    entropies = entropy_scores(bricks)
+    retired_at = np.full(len(bricks), -1, dtype=np.int64)
+    active = np.flatnonzero(entropies > 0)
+    retired_at[entropies == 0] = 0
+    for i in range(iterations):
+        if not len(active):
+            break
+        stepped = step(bricks[active], entropies[active])
+        moved = np.any(stepped != bricks[active], axis=1)
+        bricks[active] = stepped
+        entropies[active] = entropy_scores(stepped)
+        done = ~moved | (entropies[active] == 0)
+        retired_at[active[done]] = i + 1
+        active = active[~done]
+        if progress is not None and (i + 1) % progress_every == 0:
+            progress(i + 1, len(active), entropies)
+    return bricks, entropies, retired_at
+
+def report_batch(bricks, entropies, retired_at, elapsed, top=10):
+    """Prints the outcome of a run_batch: retirement counts and the lowest-entropy final bricks."""
+    perfect = np.flatnonzero(entropies == 0)
+    moving = int(np.sum(retired_at < 0))
+    print(f"Total time: {elapsed:.2f} seconds for {len(bricks):,} seed bricks.")
+    print(f"Retired: {len(perfect):,} at zero entropy, {len(bricks) - len(perfect) - moving:,} at a fixed point; "
+          f"{moving:,} still moving.")
+    if len(perfect):
+        for index in perfect[:top]:
+            print(f">>> PERFECT BRICK FOUND: {tuple(int(x) for x in bricks[index])} <<<")
+        return
+    print("Entropy census: " + ", ".join(f"{entropy}: {count:,}" for entropy, count in
+                                         enumerate(np.bincount(entropies.astype(np.int64), minlength=5).tolist())))
+    for index in np.argsort(entropies, kind='stable')[:top]:
+        print(f"  > Best state: {tuple(int(x) for x in bricks[index])} | Entropy: {entropies[index]}")
+
+def batch_summary(bricks, entropies, retired_at, elapsed, top=10):
+    """The outcome of a run_batch as a result dict: retirement counts, entropy census and the best final bricks."""
+    best = np.argsort(entropies, kind='stable')[:top]
+    moving = int(np.sum(retired_at < 0))
+    perfect = int(np.sum(entropies == 0))
+    return {'seed_bricks': len(bricks), 'retired_perfect': perfect, 'retired_fixed_point': len(bricks) - perfect - moving,
+            'still_moving': moving, 'entropy_census': np.bincount(entropies.astype(np.int64), minlength=5),
+            'best_entropy': float(entropies[best[0]]) if len(best) else None,
+            'best_bricks': bricks[best].astype(np.int64), 'elapsed': elapsed}
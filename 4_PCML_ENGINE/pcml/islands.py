@@ -0,0 +1,115 @@
+# --- pcml/islands.py ---
+# Island-model driver for the Oracle GA (CSO_P136).
+# K independent populations evolve in K worker processes, each from its own
+# spawned seed and with its own fitness cache. Every M generations an island
+# sends copies of its best genomes to the next island in a ring; immigrants
+# take the place of freshly bred children. Islands report new bests to the
+# parent over one queue, and a shared event stops every island as soon as
+# one of them reaches entropy 0.
+
+import queue
+import time
+import numpy as np
+from multiprocessing import get_context
+from pcml.genetic import (FITNESS_CACHE_SIZE, seed_population, bricks_from_genes, judge_population,
+                          breed_generation, new_fitness_cache)
+
+MIGRATION_EVERY = 20
+MIGRANTS = 10
+REPORT_POLL = 1.0  # seconds between liveness checks of the islands while waiting for reports
+
+def _island_worker(index, seed_sequence, generations, population_size, mutation_rate, max_param,
+                   migration_every, migrants, cache_size, inbox, outbox, reports, stop):
+    # Migrants nobody collects (the ring is shutting down) must not block this process's exit.
+    outbox.cancel_join_thread()
+    rng = np.random.default_rng(seed_sequence)
+    population = seed_population(rng, population_size, max_param)
+    cache = new_fitness_cache(cache_size)
+    best_entropy = float('inf')
+    evaluated = 0
+    for gen in range(generations):
+        if stop.is_set():
+            break
+        entropies = judge_population(population, cache)
+        evaluated += len(population)
+        best_index = int(np.argmin(entropies))
+        if entropies[best_index] < best_entropy:
+            best_entropy = float(entropies[best_index])
+            brick = tuple(int(side) for side in bricks_from_genes(population[best_index:best_index+1])[0])
+            reports.put(('best', index, gen, best_entropy, brick))
+            if best_entropy == 0:
+                stop.set()
+                break
+
+        migrating = migration_every > 0 and migrants > 0 and (gen + 1) % migration_every == 0
+        if migrating:
+            outbox.put(population[np.argpartition(entropies, min(migrants, len(population)) - 1)[:migrants]])
+        population = breed_generation(rng, population, entropies, mutation_rate)
+        if migrating:
+            arrivals = []
+            while True:
+                try:
+                    arrivals.append(inbox.get_nowait())
+                except queue.Empty:
+                    break
+            if arrivals:
+                # At most half the population is replaced, but always at least one genome.
+                immigrants = np.concatenate(arrivals)[-max(1, len(population) // 2):]
+                population[len(population) - len(immigrants):] = immigrants  # over the last bred children
+    reports.put(('done', index, evaluated, cache['hits'], cache['misses']))
+
+def run_islands(islands, generations, population_size, mutation_rate, max_param, seed=None,
+                migration_every=MIGRATION_EVERY, migrants=MIGRANTS, cache_size=FITNESS_CACHE_SIZE,
+                on_best=None):
+    """
+    The Archipelago: evolves `islands` populations of population_size in
+    parallel processes for up to `generations` generations. Island i is
+    seeded from SeedSequence(seed).spawn(islands)[i]. `on_best(island, gen,
+    entropy, brick)` is called whenever an island improves on the global
+    best. Returns a dict with the best brick and entropy, the genomes
+    evaluated, cache hits and misses, and the wall time. Raises
+    RuntimeError if an island process exits with an error.
+    """
+    context = get_context()
+    inboxes = [context.Queue() for _ in range(islands)]
+    reports, stop = context.Queue(), context.Event()
+    seeds = np.random.SeedSequence(seed).spawn(islands)
+    processes = [context.Process(target=_island_worker, daemon=True,
+                                 args=(index, seeds[index], generations, population_size, mutation_rate,
+                                       max_param, migration_every, migrants, cache_size,
+                                       inboxes[index], inboxes[(index + 1) % islands], reports, stop))
+                 for index in range(islands)]
+    result = {'best_brick': None, 'best_entropy': float('inf'), 'evaluated': 0, 'hits': 0, 'misses': 0}
+    start_time = time.time()
+    for process in processes:
+        process.start()
+    try:
+        running = islands
+        while running:
+            try:
+                message = reports.get(timeout=REPORT_POLL)
+            except queue.Empty:
+                # An island that died (e.g. raised) never reports 'done'; stop waiting for it.
+                for index, process in enumerate(processes):
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(f"Island {index} exited with code {process.exitcode}")
+                continue
+            if message[0] == 'best':
+                _, index, gen, entropy, brick = message
+                if entropy < result['best_entropy']:
+                    result['best_entropy'], result['best_brick'] = entropy, brick
+                    if on_best is not None: on_best(index, gen, entropy, brick)
+            else:
+                _, index, evaluated, hits, misses = message
+                result['evaluated'] += evaluated
+                result['hits'] += hits
+                result['misses'] += misses
+                running -= 1
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    result['elapsed'] = time.time() - start_time
+    return result
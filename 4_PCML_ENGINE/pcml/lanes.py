@@ -0,0 +1,87 @@
+# --- pcml/lanes.py ---
+# The Lane Analyzer behind CSO_P68.
+# The lane histogram of Im(p / kappa) is accumulated one prime block at a time
+# with fixed bin edges, so its counts are exactly those of a single
+# np.histogram over every prime while memory stays at one block. Lane centers
+# are refined below the bin width by fitting the peak bin and its two
+# neighbours, and the lane spacing is read from the histogram's power spectrum
+# rather than from the differences between neighbouring peaks.
+
+import numpy as np
+
+LANE_CHUNK = 1 << 22  # primes per streamed block
+LANE_RANGE = (-5.0, 5.0)
+REFINE_METHODS = ('parabolic', 'gaussian')
+SPECTRUM_PADDING = 8  # zero-padding factor of the spacing FFT
+MIN_LANE_CYCLES = 4   # a lane period must repeat this often across the occupied histogram
+
+def lane_histogram(prime_chunks, kappa, bins, value_range=LANE_RANGE):
+    """
+    The Prime Lattice histogram: counts of Im(p / kappa) in `bins` equal bins
+    over value_range, accumulated over a stream of ascending prime blocks.
+    Im(p / kappa) moves linearly with p, so the stream is abandoned once a
+    block ends beyond the far edge of the range. Returns (counts, bin_edges,
+    primes_read).
+    """
+    low, high = value_range
+    counts = np.zeros(bins, dtype=np.int64)
+    slope = (1 / kappa).imag
+    primes_read = 0
+    for primes in prime_chunks:
+        y_coords = (primes / kappa).imag
+        counts += np.histogram(y_coords, bins=bins, range=value_range)[0]
+        primes_read += len(primes)
+        if len(y_coords) and ((slope > 0 and y_coords[-1] > high) or (slope < 0 and y_coords[-1] < low)):
+            break
+    return counts, np.linspace(low, high, bins + 1), primes_read
+
+def refine_peaks(counts, peaks, bin_edges, method='parabolic'):
+    """
+    Sub-bin lane centers: the vertex of the parabola through each peak bin
+    and its two neighbours ('gaussian' fits the parabola to log counts, and
+    falls back to the plain fit where a neighbour is empty). The offset is
+    kept within half a bin; edge bins keep their centers.
+    """
+    peaks = np.asarray(peaks, dtype=np.int64)
+    width = bin_edges[1] - bin_edges[0]
+    centers = bin_edges[peaks] + width / 2
+    inner = (peaks > 0) & (peaks < len(counts) - 1)
+    left, mid, right = (counts[peaks[inner] + shift].astype(float) for shift in (-1, 0, 1))
+    if method == 'gaussian':
+        positive = (left > 0) & (right > 0)
+        left, mid, right = (np.where(positive, np.log(np.maximum(side, 1)), side) for side in (left, mid, right))
+    curvature = left - 2 * mid + right
+    offset = np.divide(0.5 * (left - right), curvature, out=np.zeros(len(curvature)), where=curvature < 0)
+    centers[inner] += np.clip(offset, -0.5, 0.5) * width
+    return centers
+
+def lane_spacing_fft(counts, bin_width, min_period_bins=2, min_cycles=MIN_LANE_CYCLES, padding=SPECTRUM_PADDING):
+    """
+    The Fundamental Lane Spacing: the period of the strongest frequency in
+    the power spectrum of the mean-removed histogram, taken over the span
+    between its first and last occupied bins (so an empty stretch of the
+    range adds no step to the spectrum). Periods shorter than min_period_bins
+    bins or repeating fewer than min_cycles times over the span are not
+    considered. The span is zero-padded `padding`-fold and the spectral peak
+    refined by a parabolic fit. Returns (spacing, share of the band's power
+    in the peak bin), or (None, 0.0) when no period qualifies.
+    """
+    occupied = np.flatnonzero(counts)
+    if len(occupied) < 2:
+        return None, 0.0
+    span = counts[occupied[0]:occupied[-1] + 1].astype(float)
+    size = len(span) * padding
+    power = np.abs(np.fft.rfft(span - span.mean(), n=size)) ** 2
+    frequencies = np.fft.rfftfreq(size, d=bin_width)
+    band = np.flatnonzero((frequencies >= min_cycles / (len(span) * bin_width)) &
+                          (frequencies <= 1 / (min_period_bins * bin_width)))
+    if not len(band) or power[band].max() <= 0:
+        return None, 0.0
+    k = band[np.argmax(power[band])]
+    offset = 0.0
+    if 0 < k < len(power) - 1:
+        curvature = power[k - 1] - 2 * power[k] + power[k + 1]
+        if curvature < 0:
+            offset = float(np.clip(0.5 * (power[k - 1] - power[k + 1]) / curvature, -0.5, 0.5))
+    frequency = (k + offset) / (size * bin_width)
+    return 1 / frequency, float(power[k] / power[band].sum())
@@ -0,0 +1,90 @@
+# --- pcml/output.py ---
+# Common output layer for the visualizers. matplotlib is imported only when a
+# figure is actually drawn, and with the Agg backend whenever nothing is shown,
+# so batch runs (--no-plot, --save) never start a GUI toolkit. --save writes the
+# figure (.png, .pdf, .svg; .gif for the animations) or the script's own arrays
+# (.npz) so fingerprints can be compared later.
+
+import argparse
+import os
+import numpy as np
+
+FIGURE_FORMATS = ('.png', '.pdf', '.svg')
+ANIMATION_FORMATS = ('.gif',)
+DATA_FORMATS = ('.npz',)
+
+def _save_path(formats):
+    """An argparse type that accepts a --save path with one of `formats`."""
+    def check(path):
+        if os.path.splitext(path)[1].lower() not in formats:
+            raise argparse.ArgumentTypeError(f"unsupported format '{path}' (use {', '.join(formats)})")
+        return path
+    return check
+
+def add_output_arguments(parser, animated=False):
+    """Adds --no-plot and --save PATH to a script's argument parser (animated: .gif is accepted too)."""
+    formats = FIGURE_FORMATS + DATA_FORMATS + (ANIMATION_FORMATS if animated else ())
+    parser.add_argument("--no-plot", dest="no_plot", action="store_true", help="Run without drawing or showing any figure.")
+    parser.add_argument("--save", type=_save_path(formats), default=None,
+                        help=f"Write the figure or the result arrays instead of showing it ({', '.join(formats)}).")
+
+def output_options(args):
+    """
+    The output dict the run functions take: {'show': bool, 'save': path or None}.
+    A figure is shown only when neither --no-plot nor --save is given.
+    """
+    return {'show': not (args.no_plot or args.save), 'save': args.save}
+
+def _save_format(output):
+    return os.path.splitext(output['save'])[1].lower() if output and output['save'] else None
+
+def draws_figure(output):
+    """True if the figure is shown or saved as an image (output None means the interactive default)."""
+    return output is None or output['show'] or _save_format(output) in FIGURE_FORMATS + ANIMATION_FORMATS
+
+def pyplot(output):
+    """matplotlib.pyplot, imported on first use; with the Agg backend unless the figure is shown."""
+    import matplotlib
+    if output is not None and not output['show']:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def save_arrays(output, **arrays):
+    """Writes `arrays` to the --save path if it is an .npz file."""
+    if _save_format(output) in DATA_FORMATS:
+        np.savez_compressed(output['save'], **arrays)
+        print(f"Results saved to {output['save']}")
+
+def finish_figure(fig, output):
+    """Saves the figure if asked to, then shows it or releases it."""
+    plt = pyplot(output)
+    if _save_format(output) in FIGURE_FORMATS:
+        fig.savefig(output['save'], dpi=150, facecolor=fig.get_facecolor())
+        print(f"Figure saved to {output['save']}")
+    if output is None or output['show']:
+        plt.show()
+    else:
+        plt.close(fig)
+
+def finish_animation(fig, animation, update, frames, output):
+    """
+    Plays a FuncAnimation, or off-screen: renders it to the --save .gif, or
+    steps update() through every frame (the animations compute their results
+    as they go) and saves the last frame as a figure if asked to.
+    """
+    plt = pyplot(output)
+    if output is None or output['show']:
+        plt.show()
+        return
+    if _save_format(output) in ANIMATION_FORMATS:
+        animation.save(output['save'], writer='pillow')
+        print(f"Animation saved to {output['save']}")
+    else:
+        animation.pause()
+        for frame in range(frames):
+            update(frame)
+        if _save_format(output) in FIGURE_FORMATS:
+            fig.savefig(output['save'], dpi=150, facecolor=fig.get_facecolor())
+            print(f"Figure saved to {output['save']}")
+    plt.close(fig)
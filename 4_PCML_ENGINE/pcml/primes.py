@@ -0,0 +1,117 @@
+# --- pcml/primes.py ---
+# The shared prime source for every PCML script.
+# A segmented, odd-only sieve of Eratosthenes that works through the number line
+# one cache-sized block at a time and returns an int64 ndarray directly, plus a
+# memory-mapped .npy cache so repeated runs skip the sieve entirely.
+# first_prime_chunks streams the same primes block by block for runs that
+# cannot hold them all.
+
+import math
+import os
+import numpy as np
+
+SEGMENT_SIZE = 1 << 18  # odd numbers per block (256 KiB of flags, sized for L2)
+
+def cache_path():
+    """Location of the on-disk prime cache ($PCML_CACHE_DIR, default ~/.cache/pcml)."""
+    cache_dir = os.environ.get('PCML_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pcml'))
+    return os.path.join(cache_dir, 'primes.npy')
+
+def nth_prime_upper_bound(n):
+    """An upper bound for the n-th prime: p_n < n (ln n + ln ln n) for n >= 6 (Rosser)."""
+    if n < 6:
+        return 13
+    log_n = math.log(n)
+    return int(n * (log_n + math.log(log_n))) + 1
+
+def _base_primes(limit):
+    """Plain odd-only sieve for the primes up to sqrt of the segmented range."""
+    if limit < 2:
+        return np.empty(0, dtype=np.int64)
+    sieve = np.ones((limit + 1) // 2, dtype=bool)  # index i <-> 2i + 1
+    sieve[0] = False
+    for i in range(1, (math.isqrt(limit) - 1) // 2 + 1):
+        if sieve[i]:
+            p = 2 * i + 1
+            sieve[p * p // 2::p] = False
+    return np.concatenate(([2], 2 * np.flatnonzero(sieve) + 1)).astype(np.int64)
+
+def prime_blocks(n, segment_size=SEGMENT_SIZE):
+    """Every prime <= n in ascending int64 blocks, one sieved segment at a time."""
+    if n < 2:
+        return
+    odd_base = _base_primes(math.isqrt(n))[1:]
+    yield np.array([2], dtype=np.int64)
+    low = 3
+    while low <= n:
+        high = min(low + 2 * segment_size, n + 1)  # block holds the odd numbers in [low, high)
+        block = np.ones((high - low + 1) // 2, dtype=bool)
+        for p in odd_base:
+            if p * p >= high:
+                break
+            start = max(p * p, -(-low // p) * p)
+            if start % 2 == 0:
+                start += p
+            block[(start - low) // 2::p] = False
+        yield low + 2 * np.flatnonzero(block).astype(np.int64)
+        low += 2 * segment_size
+
+def generate_primes(n, segment_size=SEGMENT_SIZE):
+    """The Sieve: every prime <= n as an int64 ndarray, sieved block by block."""
+    if n < 2:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(list(prime_blocks(n, segment_size)))
+
+def _load_cache(path):
+    try:
+        cached = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if cached.ndim != 1 or cached.dtype != np.int64:
+        return None
+    return cached
+
+def first_primes(count, use_cache=True):
+    """
+    The first `count` primes as an int64 array. With the cache enabled the
+    primes are served from a memory-mapped .npy file, which is re-sieved and
+    atomically replaced only when a run asks for more primes than it holds.
+    """
+    if count <= 0:
+        return np.empty(0, dtype=np.int64)
+    path = cache_path()
+    if use_cache:
+        cached = _load_cache(path)
+        if cached is not None and len(cached) >= count:
+            return cached[:count]
+    primes = generate_primes(nth_prime_upper_bound(count))
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, primes)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # A read-only home directory just means no cache.
+    return primes[:count]
+
+def first_prime_chunks(count, chunk_size=SEGMENT_SIZE, use_cache=True):
+    """
+    The first `count` primes as a stream of ascending int64 blocks, for runs
+    too large to hold every prime at once: slices of the memory-mapped cache
+    when it holds enough primes, otherwise the sieve's own blocks (the cache
+    is not rewritten). Memory stays at one block either way.
+    """
+    if use_cache:
+        cached = _load_cache(cache_path())
+        if cached is not None and len(cached) >= count:
+            for start in range(0, count, chunk_size):
+                yield np.asarray(cached[start:min(start + chunk_size, count)])
+            return
+    remaining = count
+    for block in prime_blocks(nth_prime_upper_bound(count), chunk_size):
+        if remaining <= 0:
+            return
+        yield block[:remaining]
+        remaining -= len(block)
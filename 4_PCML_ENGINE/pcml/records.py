@@ -0,0 +1,76 @@
+# --- pcml/records.py ---
+# Machine-readable result records for the engines.
+# With --record PATH an engine appends one record per run: which script ran,
+# when, every command-line parameter, and the result dict its run function
+# returns (best values, scores, timings and evaluation counts). A .jsonl file
+# gets one JSON object per line; a .parquet file gets one row per run, with the
+# nested fields flattened to 'params.<name>' / 'result.<name>' columns (this
+# needs pyarrow). Thousands of runs can then be loaded without parsing stdout.
+
+import argparse
+import json
+import math
+import os
+import time
+import numpy as np
+
+RECORD_FORMATS = ('.jsonl', '.parquet')
+
+def _record_path(path):
+    if os.path.splitext(path)[1].lower() not in RECORD_FORMATS:
+        raise argparse.ArgumentTypeError(f"unsupported record format '{path}' (use {', '.join(RECORD_FORMATS)})")
+    return path
+
+def add_record_argument(parser):
+    """Adds --record PATH to a script's argument parser."""
+    parser.add_argument("--record", type=_record_path, default=None,
+                        help="Append a structured result record of this run to a .jsonl or .parquet file.")
+
+def _plain(value):
+    """`value` as plain JSON data: numpy scalars and arrays unwrapped, complex as {real, imag}, inf/nan as None."""
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, complex):
+        return {'real': _plain(value.real), 'imag': _plain(value.imag)}
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def result_record(script_path, args, result):
+    """The record of one run: engine name, UTC timestamp, the parsed arguments and the result dict."""
+    params = {name: value for name, value in vars(args).items() if name != 'record'}
+    return {'engine': os.path.splitext(os.path.basename(script_path))[0],
+            'recorded_at': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+            'params': _plain(params), 'result': _plain(result)}
+
+def _flatten(record, prefix=''):
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def write_record(path, record):
+    """Appends `record` to the .jsonl or .parquet file at `path` (None: no record is kept)."""
+    if path is None:
+        return
+    if os.path.splitext(path)[1].lower() == '.jsonl':
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist([_flatten(record)])
+        if os.path.exists(path):
+            table = pa.concat_tables([pq.read_table(path), table], promote_options='permissive')
+        # Parquet files cannot be appended to: rewrite under a temporary name and rename into place.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    print(f"Result record appended to {path}")
@@ -0,0 +1,108 @@
+# --- pcml/spectrum.py ---
+# The FFT backend behind every frequency fingerprint.
+# Fingerprint images are real, so only the rfft2 half-plane is ever computed;
+# score masks are remapped onto that half-plane instead of fftshift-ing the
+# spectrum. The transform itself runs on pyFFTW (with cached plans) or
+# scipy.fft (multi-threaded) when installed, and on numpy.fft otherwise.
+
+import functools
+import os
+import numpy as np
+
+try:
+    import pyfftw
+    import pyfftw.builders
+except ImportError:
+    pyfftw = None
+try:
+    import scipy.fft as scipy_fft
+except ImportError:
+    scipy_fft = None
+
+BACKENDS = ('pyfftw', 'scipy', 'numpy')
+
+_fft_state = {'backend': None, 'workers': int(os.environ.get('PCML_FFT_WORKERS', -1)), 'plans': {}}
+
+def _available(backend):
+    return {'pyfftw': pyfftw is not None, 'scipy': scipy_fft is not None, 'numpy': True}[backend]
+
+def fft_backend():
+    """The backend in use: $PCML_FFT_BACKEND if set and installed, else the first available."""
+    if _fft_state['backend'] is None:
+        requested = os.environ.get('PCML_FFT_BACKEND')
+        if requested in BACKENDS and _available(requested):
+            _fft_state['backend'] = requested
+        else:
+            _fft_state['backend'] = next(name for name in BACKENDS if _available(name))
+    return _fft_state['backend']
+
+def set_fft_workers(workers):
+    """Threads per transform (-1 = all cores). Grid-search worker processes use 1."""
+    _fft_state['workers'] = workers
+    _fft_state['plans'].clear()
+
+def _threads():
+    workers = _fft_state['workers']
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def rfft2(images):
+    """Half-plane 2-D FFT over the last two axes of a real image or (B, N, N) stack."""
+    images = np.asarray(images, dtype=float)
+    backend = fft_backend()
+    if backend == 'pyfftw':
+        key = (images.shape, _threads())
+        plan = _fft_state['plans'].get(key)
+        if plan is None:
+            plan = pyfftw.builders.rfft2(pyfftw.empty_aligned(images.shape, dtype='float64'),
+                                         threads=_threads(), planner_effort='FFTW_MEASURE')
+            _fft_state['plans'][key] = plan
+        return plan(images).copy()  # the plan owns its output buffer
+    if backend == 'scipy':
+        return scipy_fft.rfft2(images, workers=_threads())
+    return np.fft.rfft2(images)
+
+def log_magnitude_half(images):
+    """log1p|F| on the rfft2 half-plane, computed in place on the magnitude buffer."""
+    magnitude = np.abs(rfft2(images))
+    np.log1p(magnitude, out=magnitude)
+    return magnitude
+
+def fold_to_half_spectrum(weights):
+    """
+    Maps a centred (fftshift-ed) full-spectrum weight image onto the rfft2
+    half-plane. The FFT of a real image satisfies |F(-u,-v)| = |F(u,v)|, so the
+    mirrored half of the weights is added onto the columns rfft2 keeps.
+    """
+    unshifted = np.fft.ifftshift(weights).astype(float)
+    width = unshifted.shape[1]
+    half = width // 2 + 1
+    mirrored = np.roll(unshifted[::-1, ::-1], 1, axis=(0, 1))  # mirrored[u, v] = unshifted[-u, -v]
+    folded = unshifted[:, :half].copy()
+    columns = np.arange(half)
+    paired = (columns != 0) & (2 * columns != width)
+    folded[:, paired] += mirrored[:, :half][:, paired]
+    return folded
+
+def half_spectrum_mask(mask):
+    """A centred boolean mask on the half-plane: a cell is kept if it or its mirror is."""
+    return fold_to_half_spectrum(mask) > 0
+
+@functools.lru_cache(maxsize=None)
+def _centring_index(height, width):
+    """Flat half-plane index of every pixel of the fftshift-ed full spectrum."""
+    rows = (np.arange(height)[:, None] - height // 2) % height
+    cols = (np.arange(width)[None, :] - width // 2) % width
+    mirrored = cols > width // 2
+    rows = np.where(mirrored, -rows % height, rows)
+    cols = np.where(mirrored, width - cols, cols)
+    return rows * (width // 2 + 1) + cols
+
+def centred_log_magnitude(image):
+    """
+    The Fingerprint: log1p|fftshift(fft2(image))| for a real image, built from
+    the half-plane by one gather (Hermitian symmetry) rather than a full
+    complex transform plus an fftshift copy. For plotting and peak finding.
+    """
+    height, width = image.shape[-2:]
+    half = log_magnitude_half(image)
+    return half.reshape(half.shape[:-2] + (-1,))[..., _centring_index(height, width)]
@@ -0,0 +1,76 @@
+# --- pcml/zeros.py ---
+# Real Riemann zeta zero ingest for the Zetaform scripts.
+# A zero table (plain text, one ordinate per line, e.g. Odlyzko's tables) is
+# parsed once into a compact binary .npy store; every later run memory-maps
+# the store and slices the index range it needs in O(1).
+
+import argparse
+import os
+import numpy as np
+
+INGEST_CHUNK = 1 << 20  # lines parsed per block while ingesting
+
+def _numeric_lines(text_path):
+    """Yields the stripped data lines of a zero table, skipping blanks and '#' comments."""
+    with open(text_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+def default_store_path(text_path):
+    """The binary store that sits next to a text table: zeros1.txt -> zeros1.npy."""
+    return os.path.splitext(text_path)[0] + '.npy'
+
+def ingest_zero_table(text_path, store_path=None, dtype=np.float64):
+    """
+    The Ingest: parses a text zero table into a .npy store of `dtype`
+    (float64, or np.longdouble to keep every digit of high-precision tables).
+    Parses in blocks of INGEST_CHUNK lines, so tables larger than RAM are fine.
+    The store is written under a temporary name and renamed into place.
+    Returns the store path.
+    """
+    store_path = store_path or default_store_path(text_path)
+    count = sum(1 for _ in _numeric_lines(text_path))
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    store = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(count,))
+    filled, block = 0, []
+    for line in _numeric_lines(text_path):
+        block.append(line)
+        if len(block) == INGEST_CHUNK:
+            store[filled:filled + len(block)] = np.array(block, dtype=dtype)
+            filled += len(block); block = []
+    if block:
+        store[filled:filled + len(block)] = np.array(block, dtype=dtype)
+    store.flush()
+    del store
+    os.replace(tmp_path, store_path)
+    return store_path
+
+def load_zeros(path, start=0, stop=None):
+    """
+    Memory-maps the zeros with index in [start, stop) from a .npy store. A text
+    table is ingested to its sibling .npy store first if that store is missing
+    or older than the table. Raises ValueError if the store holds fewer zeros
+    than the range asks for.
+    """
+    if not path.endswith('.npy'):
+        store_path = default_store_path(path)
+        if not os.path.exists(store_path) or os.path.getmtime(store_path) < os.path.getmtime(path):
+            ingest_zero_table(path, store_path)
+        path = store_path
+    store = np.load(path, mmap_mode='r')
+    if start >= len(store) or (stop is not None and stop > len(store)):
+        wanted = f"[{start}, {stop})" if stop is not None else f"from index {start}"
+        raise ValueError(f"Zeros {wanted} requested, but {path} holds only {len(store)} zeros")
+    return store[start:stop]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a Riemann zeta zero table into a binary store.")
+    parser.add_argument("table", help="Text table with one zero ordinate per line.")
+    parser.add_argument("--store", type=str, default=None, help="Output .npy path (default: next to the table).")
+    parser.add_argument("--longdouble", action="store_true", help="Store as long double instead of float64.")
+    args = parser.parse_args()
+    path = ingest_zero_table(args.table, args.store, np.longdouble if args.longdouble else np.float64)
+    store = np.load(path, mmap_mode='r')
+    print(f"Stored {len(store)} zeros ({store.dtype}) in {path}")
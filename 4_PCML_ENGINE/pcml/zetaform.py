@@ -0,0 +1,101 @@
+# --- pcml/zetaform.py ---
+# Vectorized Zetaform pipeline shared by the zeta scripts: the seeded synthetic
+# zero generator and the (v1, v2, v3) shape vectors, each computed for the whole
+# array at once instead of one Python iteration per zero.
+
+import numpy as np
+from pcml.zeros import load_zeros
+
+FIRST_ZERO = 14.134725
+
+def resolve_seed(seed):
+    """--seed: the given seed, or a fresh one to print so the run can be repeated."""
+    return seed if seed is not None else int(np.random.SeedSequence().entropy % (1 << 32))
+
+def generate_zeta_like_data(n, seed=None):
+    """
+    The Synthetic Zeros: n ordinates following the mean zero spacing with +/-5%
+    jitter, t[k+1] = t[k] + 2pi / ln t[k] * (1 + (u[k] - 0.5) * 0.1).
+    All jitter u comes from one draw of a seeded np.random.Generator. The
+    recurrence is solved for the whole array by Newton's method: each
+    linearised step is a first-order linear recurrence, solved exactly with one
+    cumprod and one cumsum, and a few passes reach rounding level.
+    """
+    if n <= 0:
+        return np.empty(0)
+    jitter = 1 + (np.random.default_rng(seed).random(n - 1) - 0.5) * 0.1
+    steps = 2 * np.pi * np.arange(n)
+    t_values = FIRST_ZERO + steps / np.log(FIRST_ZERO + steps / np.log(FIRST_ZERO + steps))  # smooth start
+    for _ in range(20):
+        log_t = np.log(t_values[:-1])
+        residual = t_values[:-1] + 2 * np.pi / log_t * jitter - t_values[1:]
+        growth = np.cumprod(1 - 2 * np.pi * jitter / (t_values[:-1] * log_t**2))
+        correction = growth * np.cumsum(residual / growth)
+        t_values[1:] += correction
+        if np.max(np.abs(correction) / t_values[1:], initial=0.0) < 1e-13: break
+    return t_values
+
+def zeta_ordinates(num_zeros, seed=None, zeros_file=None, zero_start=0):
+    """
+    The t-values a Zetaform script runs on: num_zeros real zeros from
+    `zeros_file` (a text table or .npy store, see pcml.zeros) starting at index
+    `zero_start`, or seeded synthetic data when no file is given.
+    Returns the float64 array and a short description of where it came from.
+    """
+    if zeros_file:
+        t_values = np.asarray(load_zeros(zeros_file, zero_start, zero_start + num_zeros), dtype=float)
+        return t_values, f"{len(t_values)} real zeros from {zeros_file} (index {zero_start} onward)"
+    seed = resolve_seed(seed)
+    return generate_zeta_like_data(num_zeros, seed), f"synthetic, seed {seed}"
+
+def zeta_shape_vectors(t_values):
+    """
+    The Shape Vectors: an (n, 3) array of (v1, v2, v3) per zero, where with
+    g_in / g_out the gaps before / after t_n:
+        v1 = log(g_out) / log(g_in), v2 = (g_in + g_out) / 2,
+        v3 = |g_out - g_in| / (g_in + g_out).
+    Matches the old per-element compute_zeta_shape_vector exactly: the two end points
+    get (1, t, 0) and any degenerate gap (<= 1e-9) gets (1, 1, 0).
+    """
+    t_values = np.asarray(t_values, dtype=float)
+    shape_vectors = np.empty((len(t_values), 3))
+    shape_vectors[:, 0] = 1.0
+    shape_vectors[:, 1] = t_values
+    shape_vectors[:, 2] = 0.0
+    if len(t_values) < 3:
+        return shape_vectors
+
+    gaps = np.diff(t_values)
+    g_in, g_out = gaps[:-1], gaps[1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v1 = np.log(g_out) / np.log(g_in)
+        v2 = (g_in + g_out) / 2
+        v3 = np.abs(g_out - g_in) / (g_in + g_out)
+    degenerate = (g_in <= 1e-9) | (g_out <= 1e-9)
+    shape_vectors[1:-1, 0] = np.where(degenerate, 1.0, v1)
+    shape_vectors[1:-1, 1] = np.where(degenerate, 1.0, v2)
+    shape_vectors[1:-1, 2] = np.where(degenerate, 0.0, v3)
+    return shape_vectors
+
+def zeta_shape_hashes(t_values):
+    """The scalar shape hash v1 per zero (compute_zeta_shape_hash), 1.0 at the ends."""
+    return zeta_shape_vectors(t_values)[:, 0]
+
+def zeta_shape_hash_chunks(t_values, chunk_size):
+    """
+    zeta_shape_hashes in (start, hashes) blocks of chunk_size zeros. Each block
+    is computed with one neighbour on either side, so the values equal the
+    whole-array ones while only one block of t_values is read at a time.
+    """
+    count = len(t_values)
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        low, high = max(start - 1, 0), min(stop + 1, count)
+        yield start, zeta_shape_hashes(t_values[low:high])[start - low:stop - low]
+
+def normalized_shape_components(shape_vectors):
+    """The modulator inputs: v1 clipped to [0.5, 1.5], v2 over its mean, v3 as is."""
+    v1_norm = np.clip(shape_vectors[:, 0], 0.5, 1.5)
+    v2_norm = shape_vectors[:, 1] / np.mean(shape_vectors[:, 1])
+    v3_norm = shape_vectors[:, 2]
+    return v1_norm, v2_norm, v3_norm
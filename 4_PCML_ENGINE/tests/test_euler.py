@@ -0,0 +1,37 @@
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pcml.euler import pythagorean_pairs, euler_brick_chunks, primitive_bricks
+
+LIMIT = 20000
+
+def brute_force_pairs(limit):
+    """Every (a, b), a < b <= limit, with a² + b² square, by testing each b for each a."""
+    pairs = []
+    for a in range(1, limit):
+        b = np.arange(a + 1, limit + 1, dtype=np.int64)
+        sums = a * a + b * b
+        roots = np.sqrt(sums).astype(np.int64)
+        pairs.extend((a, int(x)) for x in b[roots * roots == sums])
+    return pairs
+
+def test_pythagorean_pairs_match_brute_force():
+    small, large = pythagorean_pairs(LIMIT)
+    assert list(zip(small.tolist(), large.tolist())) == brute_force_pairs(LIMIT)
+
+def test_primitive_euler_bricks_match_brute_force():
+    partners = {}
+    for a, b in brute_force_pairs(LIMIT):
+        partners.setdefault(a, []).append(b)
+    pair_set = {(a, b) for a, legs in partners.items() for b in legs}
+    expected = {(a, b, c) for a, legs in partners.items() for i, b in enumerate(legs) for c in legs[i + 1:]
+                if (b, c) in pair_set and math.gcd(a, b, c) == 1}
+    found = set()
+    for bricks, _ in euler_brick_chunks(LIMIT):
+        found.update(map(tuple, primitive_bricks(bricks).tolist()))
+    assert (6072, 16929, 18560) in expected
+    assert found == expected